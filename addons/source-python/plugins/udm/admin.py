@@ -54,7 +54,7 @@ admin_menu = _AdminMenu(title='Admin Menu')
 @admin_menu.register_close_callback
 def on_close_admin_menu(menu, player_index):
     """Enable default gameplay for the admin player who just closed the Admin menu."""
-    player = PlayerEntity(player_index)
+    player = PlayerEntity.cached(player_index)
 
     # Remove the player from the Admin menu users storage
     admin_menu.users.remove(player.userid)
@@ -0,0 +1,181 @@
+# ../udm/benchmarks.py
+
+"""Provides micro-benchmarks which can be run on a live server via `udm_benchmark` (registered in udm.py)."""
+
+# =============================================================================
+# >> IMPORTS
+# =============================================================================
+# Python Imports
+#   Random
+import random
+#   Timeit
+import timeit
+#   Tracemalloc
+import tracemalloc
+
+# Source.Python Imports
+#   Core
+from core import echo_console
+from core import GAME_NAME
+#   Filters
+from filters.players import PlayerIter
+
+# Script Imports
+#   Config
+from udm.config import cvar_parked_inventories_capacity
+#   Players
+from udm.players import ParkedRecords
+from udm.players import PlayerEntity
+from udm.players import PlayerRecord
+#   Weapons
+from udm.weapons import weapon_manager
+from udm.weapons import WeaponManager
+from udm.weapons.cache import WeaponTableCache
+
+
+# =============================================================================
+# >> CONSTANTS
+# =============================================================================
+# Amount of timing runs per benchmark (the fastest one is reported)
+BENCHMARK_REPEAT = 5
+
+# Amount of player slots and disconnects simulated by the player_records benchmark
+CHURN_SLOTS = 64
+CHURN_DISCONNECTS = 20000
+
+
+# =============================================================================
+# >> HELPER FUNCTIONS
+# =============================================================================
+def time_call(function, number):
+    """Return the time (in microseconds) one call of `function` takes, taking the fastest of all runs."""
+    return min(timeit.repeat(function, number=number, repeat=BENCHMARK_REPEAT)) / number * 1000000
+
+
+def report(name, *results):
+    """Print the (label, microseconds) `results` of a benchmark, relative to the first one."""
+    echo_console(f'[UDM] Benchmark: {name}')
+
+    baseline = results[0][1]
+
+    for label, microseconds in results:
+        echo_console(f'    {label:<40}{microseconds:>12.2f} us{baseline / microseconds:>10.1f}x')
+
+
+# =============================================================================
+# >> BENCHMARKS
+# =============================================================================
+class _Benchmarks(dict):
+    """Class used to store benchmarks as name => function mappings."""
+
+    def register(self, name):
+        """Register the decorated function as benchmark `name`."""
+        def decorator(function):
+            self[name] = function
+            return function
+
+        return decorator
+
+
+# Store a global instance of `_Benchmarks`
+benchmarks = _Benchmarks()
+
+
+@benchmarks.register('weapon_table')
+def benchmark_weapon_table():
+    """Compare parsing & validating the weapon data file with loading the cached weapon table."""
+    cache = WeaponTableCache(WeaponManager.ini_file, GAME_NAME)
+
+    # Make sure the cache is up to date
+    if cache.load() is None:
+        cache.save(*WeaponManager.read_table())
+
+    report(
+        'weapon table load',
+        ('ConfigObj + validation', time_call(WeaponManager.read_table, 20)),
+        ('cached snapshot', time_call(cache.load, 20))
+    )
+
+
+@benchmarks.register('player_wrappers')
+def benchmark_player_wrappers():
+    """Compare constructing PlayerEntity instances with looking up cached ones."""
+    player = next(iter(PlayerIter()), None)
+
+    if player is None:
+        echo_console('[UDM] The player_wrappers benchmark needs at least one player on the server.')
+        return
+
+    index, userid = player.index, player.userid
+
+    report(
+        'PlayerEntity lookup',
+        ('PlayerEntity.from_userid(userid)', time_call(lambda: PlayerEntity.from_userid(userid), 10000)),
+        ('PlayerEntity(index)', time_call(lambda: PlayerEntity(index), 10000)),
+        ('PlayerEntity.cached_from_userid(userid)', time_call(lambda: PlayerEntity.cached_from_userid(userid), 10000)),
+        ('PlayerEntity.cached(index)', time_call(lambda: PlayerEntity.cached(index), 10000))
+    )
+
+
+@benchmarks.register('player_records')
+def benchmark_player_records():
+    """Measure the memory of player records with 64 players churning over a long map.
+
+    Every disconnecting player is replaced by a new one (or, every tenth time, by a returning one).
+    A third of all players choose weapons for their inventory, the others stay in random mode.
+    The live records are swapped out while the benchmark runs, and inventory storage is bypassed.
+    """
+    records_store, parked_records_store = PlayerEntity.records_store, PlayerEntity.parked_records_store
+    PlayerEntity.records_store = dict()
+    PlayerEntity.parked_records_store = ParkedRecords(cvar_parked_inventories_capacity)
+
+    weapons = list(weapon_manager.values())
+    tracemalloc.start()
+
+    try:
+        connected = [f'BENCHMARK_{slot}' for slot in range(CHURN_SLOTS)]
+
+        for disconnects in range(CHURN_DISCONNECTS):
+            slot = random.randrange(CHURN_SLOTS)
+
+            # Get the player's record like `PlayerEntity.get_record()`, without loading it from storage
+            record = PlayerEntity.records_store.get(connected[slot])
+
+            if record is None:
+                record = PlayerEntity.parked_records_store.restore(connected[slot])
+
+                if record is None:
+                    record = PlayerRecord()
+
+                PlayerEntity.records_store[connected[slot]] = record
+
+            # Use the player's record the way a round of playing does
+            record.team_changes += 1
+
+            if weapons and random.randrange(3) == 0:
+                record.inventories[record.selection].add_inventory_item(random.choice(weapons))
+                record.random_mode = False
+
+            # Disconnect the player and let a new or returning player take the slot
+            PlayerEntity.park_record(connected[slot])
+
+            if disconnects % 10 == 0 and PlayerEntity.parked_records_store:
+                connected[slot] = next(iter(PlayerEntity.parked_records_store))
+            else:
+                connected[slot] = f'BENCHMARK_{CHURN_SLOTS + disconnects}'
+
+        current, peak = tracemalloc.get_traced_memory()
+        records = len(PlayerEntity.records_store) + len(PlayerEntity.parked_records_store)
+        evictions = PlayerEntity.parked_records_store.evictions
+
+    finally:
+        tracemalloc.stop()
+        PlayerEntity.records_store, PlayerEntity.parked_records_store = records_store, parked_records_store
+
+    echo_console(f'[UDM] Benchmark: player records ({CHURN_SLOTS} slots, {CHURN_DISCONNECTS} disconnects)')
+    echo_console(f'    {"records kept":<40}{records:>12}')
+    echo_console(f'    {"records evicted":<40}{evictions:>12}')
+    echo_console(f'    {"memory (current)":<40}{current / 1024:>12.1f} KiB')
+    echo_console(f'    {"memory (peak)":<40}{peak / 1024:>12.1f} KiB')
+    echo_console(f'    {"memory per record":<40}{current / max(records, 1):>12.1f} B')
+
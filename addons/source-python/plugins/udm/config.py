@@ -34,6 +34,37 @@ with ConfigManager(info.name, f'{info.name}_') as config:
         'The respawn delay (in seconds).'
     )
 
+    config.text('----------------------------------')
+    config.text('   * Spawn Locations')
+    config.text('----------------------------------')
+
+    cvar_spawn_mode = config.cvar(
+        'spawn_mode',
+        0,
+        'Spawn location selection mode'
+    )
+
+    cvar_spawn_mode.Options.append('0 = First free spawn location of the shuffled deck')
+    cvar_spawn_mode.Options.append('1 = Free spawn location scored safest by enemy distance and recent deaths')
+
+    cvar_spawn_reservation_cooldown = config.cvar(
+        'spawn_reservation_cooldown',
+        3,
+        'Time (in seconds) a spawn location is skipped after it has been handed out.'
+    )
+
+    cvar_spawn_visibility_checks = config.cvar(
+        'spawn_visibility_checks',
+        1,
+        'Skip spawn locations an enemy can see (if any other spawn location is free)?'
+    )
+
+    cvar_spawn_visibility_traces_per_tick = config.cvar(
+        'spawn_visibility_traces_per_tick',
+        8,
+        'Amount of traces per tick used to build the spawn location visibility matrix of a map (0 = off).'
+    )
+
     config.text('----------------------------------')
     config.text('   * Spawn Protection')
     config.text('----------------------------------')
@@ -54,6 +85,16 @@ with ConfigManager(info.name, f'{info.name}_') as config:
         'Enable infinite ammo?'
     )
 
+    config.text('----------------------------------')
+    config.text('   * Dropped Weapons')
+    config.text('----------------------------------')
+
+    cvar_max_ground_weapons = config.cvar(
+        'max_ground_weapons',
+        32,
+        'Maximum amount of dropped weapons on the ground (0 = no limit). The oldest ones are removed first.'
+    )
+
     config.text('----------------------------------')
     config.text('   * NoBlock')
     config.text('----------------------------------')
@@ -111,6 +152,16 @@ with ConfigManager(info.name, f'{info.name}_') as config:
         'Time penalty (in minutes) for exceeding the maximum team change count.'
     )
 
+    config.text('----------------------------------')
+    config.text('   * Inventories')
+    config.text('----------------------------------')
+
+    cvar_parked_inventories_capacity = config.cvar(
+        'parked_inventories_capacity',
+        512,
+        'Maximum amount of disconnected players whose inventories are kept. The least recently disconnected ones are dropped first.'
+    )
+
     config.text('----------------------------------')
     config.text('   * Say Commands')
     config.text('----------------------------------')
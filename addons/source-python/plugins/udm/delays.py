@@ -5,98 +5,316 @@
 # =============================================================================
 # >> IMPORTS
 # =============================================================================
+# Python Imports
+#   Array
+from array import array
+#   Math
+import math
+#   Time
+import time
+
 # Source.Python Imports
 #   Core
 from core import AutoUnload
+#   Engines
+from engines.server import global_vars
+#   Hooks
+from hooks.exceptions import except_hooks
 #   Listeners
-from listeners.tick import Delay
+from listeners import on_tick_listener_manager
+
+
+# =============================================================================
+# >> CONSTANTS
+# =============================================================================
+# Amount of slots in the timer wheel (one slot per tick)
+TIMER_WHEEL_SIZE = 512
+
+# Amount of buckets in the histograms (bucket n counts values below 2 ** n microseconds)
+HISTOGRAM_SIZE = 32
+
+
+# =============================================================================
+# >> DELAY STATS
+# =============================================================================
+class DelayStats(object):
+    """Class used to collect lateness and callback cost histograms for a delay namespace.
+
+    Both histograms use power-of-two buckets of microseconds, so recording a value is a single
+    `int.bit_length()` call and an array increment.
+    """
+
+    __slots__ = ('calls', 'peak', 'lateness', 'cost')
+
+    def __init__(self):
+        """Object initialization."""
+        # Store the amount of callbacks called
+        self.calls = 0
+
+        # Store the highest amount of delays pending at once
+        self.peak = 0
+
+        # Store the lateness and callback cost histograms
+        self.lateness = array('I', bytes(4 * HISTOGRAM_SIZE))
+        self.cost = array('I', bytes(4 * HISTOGRAM_SIZE))
+
+    def record(self, lateness, cost):
+        """Record a callback which was called `lateness` seconds late and took `cost` seconds."""
+        self.calls += 1
+        self.lateness[min(int(max(lateness, 0) * 1000000).bit_length(), HISTOGRAM_SIZE - 1)] += 1
+        self.cost[min(int(cost * 1000000).bit_length(), HISTOGRAM_SIZE - 1)] += 1
+
+    @staticmethod
+    def percentile(histogram, fraction):
+        """Return the upper bound (in milliseconds) of the bucket containing the given fraction of all values."""
+        total = sum(histogram)
+
+        if not total:
+            return 0.0
 
-# Script Imports
-#   Info
-from udm.info import info
+        # Walk the buckets until the fraction is reached
+        count = 0
+
+        for bucket, bucket_count in enumerate(histogram):
+            count += bucket_count
+
+            if count >= total * fraction:
+                return (1 << bucket) / 1000 if bucket else 0.0
+
+        return (1 << (HISTOGRAM_SIZE - 1)) / 1000
+
+
+# =============================================================================
+# >> SCHEDULED CALL
+# =============================================================================
+class _ScheduledCall(object):
+    """Class used to store a callback scheduled on the timer wheel."""
+
+    __slots__ = ('tick', 'due', 'callback', 'args', 'call_on_cancel', 'running')
+
+    def __init__(self, tick, due, callback, args, call_on_cancel):
+        """Object initialization."""
+        # Store the tick and the time the callback is due at
+        self.tick = tick
+        self.due = due
+
+        # Store the callback and its arguments
+        self.callback = callback
+        self.args = args
+
+        # Store whether the callback should be called on cancel
+        self.call_on_cancel = call_on_cancel
+
+        # Store whether the callback is still pending
+        self.running = True
+
+    def __call__(self):
+        """Call the callback."""
+        self.running = False
+        return self.callback(*self.args)
+
+    def cancel(self):
+        """Mark the callback as no longer pending."""
+        self.running = False
 
 
 # =============================================================================
 # >> DELAY MANAGER
 # =============================================================================
 class _DelayManager(dict, AutoUnload):
-    """Class used to manage delays."""
+    """Class used to manage delays.
+
+    All delays share one timer wheel driven by a single tick listener: each pending delay is stored in
+    the slot of the tick it is due at, so scheduling and cancelling a delay are dictionary operations
+    and each tick only looks at the delays of one slot.
+
+    Delay keys are (namespace, owner) tuples, e.g. ('respawn', <player index>) or ('drop', <weapon index>).
+    Owners are entity indexes (or None), so all delays of a player or weapon can be cancelled at once.
+
+    For each namespace the amount of pending delays as well as the lateness and callback cost of called
+    delays are tracked (see `DelayStats`).
+    """
 
     # Remember whether delays are enabled
     delays_enabled = True
 
-    def __init__(self, prefix):
+    def __init__(self):
         """Object initialization."""
         # Call dict's constructor
         super().__init__()
 
-        # Store the key prefix
-        self._prefix = prefix
+        # Store the keys of pending delays by owner and by namespace
+        self._by_owner = dict()
+        self._by_namespace = dict()
 
-        # Store a mapping of delay callbacks which should be called on cancel
-        self._call_on_cancel = dict()
+        # Store the stats of each namespace as namespace => `DelayStats`
+        self.stats = dict()
 
-    def __call__(self, key, delay, callback, args=(), call_on_cancel=False):
-        """Add the delay object and reference it by `key`."""
-        # Format the delay key
-        key = self._format_key(key)
+        # Store the timer wheel slots as key => `_ScheduledCall` mappings
+        self._slots = [dict() for _ in range(TIMER_WHEEL_SIZE)]
+
+        # Store the current tick of the timer wheel
+        self._tick = 0
+
+        # Store whether the tick listener is registered
+        self._listening = False
 
+    def __call__(self, key, delay, callback, args=(), call_on_cancel=False):
+        """Add the delay object and reference it by `key` - a (namespace, owner) tuple."""
         # Cancel the delay for the key, if it is running
         self.cancel(key)
 
-        # Store whether the callback should be called on cancel
-        self._call_on_cancel[key] = call_on_cancel
-
         # Add the delay if delays are enabled
         if self.delays_enabled:
-            self[key] = Delay(delay, callback, args)
+
+            # Get the tick the delay is due at
+            tick = self._tick + max(1, math.ceil(delay / global_vars.interval_per_tick))
+
+            # Store the scheduled call in this dict and in its timer wheel slot
+            self[key] = self._slots[tick % TIMER_WHEEL_SIZE][key] = _ScheduledCall(
+                tick, time.time() + delay, callback, args, call_on_cancel
+            )
+
+            # Index the key by its owner and namespace
+            namespace, owner = key
+            self._by_owner.setdefault(owner, set()).add(key)
+            keys = self._by_namespace.setdefault(namespace, set())
+            keys.add(key)
+
+            # Remember the highest amount of pending delays in the namespace
+            stats = self.get_stats(namespace)
+            stats.peak = max(stats.peak, len(keys))
+
+            # Start listening for ticks
+            if not self._listening:
+                on_tick_listener_manager.register_listener(self._on_tick)
+                self._listening = True
 
     def cancel(self, key):
         """Cancel the delay if it is running."""
-        # Format the delay key
-        key = self._format_key(key)
-
         if key in self:
 
-            # Get the delay object referenced `key`
-            delay = self[key]
+            # Remove the delay object referenced by `key` from this dict, its timer wheel slot and the indexes
+            delay = self._remove(key)
 
             # Cancel it if it is running
             if delay.running:
-                if self._call_on_cancel[key]:
+                if delay.call_on_cancel:
                     delay()
                 else:
                     delay.cancel()
 
-            # Remove `key` from this dict
-            del self[key]
-            del self._call_on_cancel[key]
+    def cancel_owner(self, owner):
+        """Cancel all pending delays of `owner`."""
+        for key in list(self._by_owner.get(owner, ())):
+            self.cancel(key)
+
+    def cancel_namespace(self, namespace):
+        """Cancel all pending delays in `namespace`."""
+        for key in list(self._by_namespace.get(namespace, ())):
+            self.cancel(key)
+
+    def pending(self, namespace):
+        """Return the amount of pending delays in `namespace`."""
+        return len(self._by_namespace.get(namespace, ()))
+
+    def get_stats(self, namespace):
+        """Return the `DelayStats` instance for `namespace`."""
+        stats = self.stats.get(namespace)
+
+        if stats is None:
+            stats = self.stats[namespace] = DelayStats()
+
+        return stats
+
+    def reset_stats(self):
+        """Reset the stats of all namespaces."""
+        self.stats.clear()
 
     def clear(self):
         """Cancel all pending delays."""
-        for key in self.copy():
-            self.cancel(key)
+        delays = list(self.values())
+
+        # Drop all delays at once
+        super().clear()
+        self._by_owner.clear()
+        self._by_namespace.clear()
+
+        for slot in self._slots:
+            slot.clear()
+
+        # Cancel them
+        for delay in delays:
+            if delay.call_on_cancel:
+                try:
+                    delay()
+                except:
+                    except_hooks.print_exception()
+            else:
+                delay.cancel()
 
         # Disable delays
         self.delays_enabled = False
 
-    @property
-    def prefix(self):
-        """Return the key prefix."""
-        return self._prefix
+    def _remove(self, key):
+        """Remove the delay referenced by `key` from this dict, its timer wheel slot and the indexes."""
+        delay = self.pop(key)
+        del self._slots[delay.tick % TIMER_WHEEL_SIZE][key]
+
+        namespace, owner = key
+
+        # Remove the key from the indexes, dropping empty entries
+        for index, index_key in ((self._by_owner, owner), (self._by_namespace, namespace)):
+            keys = index[index_key]
+            keys.discard(key)
+
+            if not keys:
+                del index[index_key]
+
+        return delay
+
+    def _on_tick(self):
+        """Advance the timer wheel and call all delays due at the current tick."""
+        self._tick += 1
+        slot = self._slots[self._tick % TIMER_WHEEL_SIZE]
+
+        # Get the delays due (the slot also holds delays due on later turns of the wheel)
+        due = [(key, delay) for key, delay in slot.items() if delay.tick <= self._tick]
+        now = time.time()
+
+        for key, delay in due:
+
+            # Skip delays which have been cancelled or rescheduled by an earlier callback
+            if slot.get(key) is not delay:
+                continue
+
+            self._remove(key)
+
+            # Call the delay, but don't let a failing callback stop the others
+            start = time.perf_counter()
+
+            try:
+                delay()
+            except:
+                except_hooks.print_exception()
+
+            # Record its lateness and cost
+            self.get_stats(key[0]).record(now - delay.due, time.perf_counter() - start)
 
-    def _format_key(self, key):
-        """Prepend `key` with the key prefix."""
-        if not key.startswith(self.prefix):
-            return f'{self.prefix}_{key}'
+        # Stop listening for ticks if no delays are pending
+        self._stop_listening()
 
-        # Return the key if it is already prepended with the key prefix
-        return key
+    def _stop_listening(self):
+        """Unregister the tick listener if no delays are pending."""
+        if not self and self._listening:
+            on_tick_listener_manager.unregister_listener(self._on_tick)
+            self._listening = False
 
     def _unload_instance(self):
         """Cancel all pending delays on unload."""
         self.clear()
+        self._stop_listening()
 
 
 # Store a global instance of `_DelayManager`
-delay_manager = _DelayManager(info.name)
+delay_manager = _DelayManager()
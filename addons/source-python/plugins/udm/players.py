@@ -8,17 +8,18 @@
 # Python Imports
 #   Collections
 from collections import defaultdict
+from collections import OrderedDict
 #   Contextlib
 import contextlib
 #   Datetime
 import datetime
-#   Random
-import random
 
 # Source.Python Imports
 #   Colors
 from colors import Color
 from colors import WHITE
+#   Entities
+from entities.helpers import inthandle_from_index
 #   Core
 from core import GAME_NAME
 #   Filters
@@ -31,24 +32,36 @@ from messages.colors.saytext2 import ORANGE as MESSAGE_COLOR_ORANGE
 from messages.colors.saytext2 import WHITE as MESSAGE_COLOR_WHITE
 #   Players
 from players.entity import Player
+from players.helpers import index_from_userid
+from players.helpers import userid_from_index
 #   Weapons
 from weapons.entity import Weapon
 
 # Script Imports
 #   Config
+from udm.config import cvar_parked_inventories_capacity
 from udm.config import cvar_team_changes_per_round
 from udm.config import cvar_team_changes_reset_delay
 from udm.config import cvar_respawn_delay
+from udm.config import cvar_spawn_mode
+from udm.config import cvar_spawn_visibility_checks
 #   Delays
 from udm.delays import delay_manager
 #   Info
 from udm.info import info
+#   Storage
+from udm.storage import BOT_UNIQUEID_PREFIX
+from udm.storage import inventory_storage
 #   Spawn Points
-from udm.spawn_locations import SAFE_SPAWN_DISTANCE
 from udm.spawn_locations import spawn_location_manager
 from udm.spawn_locations import SpawnLocation
+from udm.spawn_locations.scoring import spawn_scorer
+from udm.spawn_locations.snapshot import player_snapshot
+from udm.spawn_locations.visibility import spawn_visibility
 #   Weapons
 from udm.weapons import weapon_manager
+from udm.weapons.collisions import classname_collisions
+from udm.weapons.deck import random_weapon_decks
 
 
 # =============================================================================
@@ -57,33 +70,40 @@ from udm.weapons import weapon_manager
 class InventoryItem(object):
     """Class used to provide an inventory item."""
 
+    __slots__ = ('_weapon_id', 'silencer_option')
+
     def __init__(self):
         """Object initialization."""
-        # Default the weapon's basename to None
-        self._basename = None
+        # Default the weapon's ID to None
+        self._weapon_id = None
 
         # Store the silencer option for this inventory item
         self.silencer_option = False
 
-    def set_basename(self, value):
-        """Set the basename and silencer option if the weapon can be silenced."""
-        # Set the basename
-        self._basename = value
+    def set_weapon_id(self, value):
+        """Set the weapon ID and silencer option if the weapon can be silenced."""
+        # Set the weapon ID
+        self._weapon_id = value
 
         # Set the silencer option to True if the game is CS:GO, else False
         self.silencer_option = self.data.has_silencer and GAME_NAME == 'csgo'
 
-    def get_basename(self):
-        """Return the basename."""
-        return self._basename
+    def get_weapon_id(self):
+        """Return the weapon ID."""
+        return self._weapon_id
+
+    # Set the "weapon_id" property for `_InventoryItem`
+    weapon_id = property(get_weapon_id, set_weapon_id)
 
-    # Set the "basename" property for `_InventoryItem`
-    basename = property(get_basename, set_basename)
+    @property
+    def basename(self):
+        """Return the weapon's basename."""
+        return self.data.basename
 
     @property
     def data(self):
         """Return the weapon's data."""
-        return weapon_manager[self.basename]
+        return weapon_manager.by_id(self._weapon_id)
 
 
 class Inventory(defaultdict):
@@ -97,10 +117,10 @@ class Inventory(defaultdict):
         """Override keys to reverse its order."""
         yield from sorted(self, reverse=True)
 
-    def add_inventory_item(self, basename, weapon_data):
-        """Add an inventory item for `basename` and equip the player with it."""
-        # Set the inventory item's basename
-        self[weapon_data.tag].basename = basename
+    def add_inventory_item(self, weapon_data):
+        """Add an inventory item for the weapon."""
+        # Set the inventory item's weapon ID
+        self[weapon_data.tag].weapon_id = weapon_data.id
 
     def remove_inventory_item(self, player, tag):
         """Remove an inventory item for weapon tag `tag`."""
@@ -116,13 +136,11 @@ class Inventory(defaultdict):
 
 
 class Inventories(defaultdict):
-    """Class used to provide multiple inventories and weapon selections for players."""
-
-    # Store weapon selections
-    selections = defaultdict(int)
+    """Class used to provide multiple inventories for a player."""
 
-    # Store random weapon selections, defaults to True for every new player
-    selections_random = defaultdict(lambda: True)
+    def __init__(self):
+        """Make `Inventory` the default value type."""
+        super().__init__(Inventory)
 
     def clear(self):
         """Perform a full clean up of all the inventories."""
@@ -131,6 +149,105 @@ class Inventories(defaultdict):
 
         super().clear()
 
+    @property
+    def empty(self):
+        """Return whether none of the inventories holds an inventory item."""
+        return not any(self.values())
+
+
+class PlayerRecord(object):
+    """Class used to store all personal state of a player in one place.
+
+        * inventories and the inventory selection last until the record is evicted (and are persisted)
+        * random mode lasts until the player disconnects
+        * team changes and the spawn & random weapon cursors last until the end of the map
+        * changes are only persisted once the stored inventories have been loaded
+    """
+
+    __slots__ = (
+        'inventories', 'selection', 'random_mode', 'team_changes', 'spawn_cursor', 'random_cursors', 'loaded', 'unsaved'
+    )
+
+    def __init__(self):
+        """Object initialization."""
+        # Store the player's inventories and the selected one
+        self.inventories = Inventories()
+        self.selection = 0
+
+        # Store whether the player is in random mode, defaults to True for every new player
+        self.random_mode = True
+
+        # Store the player's team change count
+        self.team_changes = 0
+
+        # Store the player's cursors into the shared spawn and random weapon decks (created on first use)
+        self.spawn_cursor = None
+        self.random_cursors = None
+
+        # Store whether the stored inventories have been loaded, and whether changes were made before that
+        self.loaded = False
+        self.unsaved = False
+
+    def reset(self):
+        """Reset the state which only lasts until the end of the map."""
+        self.team_changes = 0
+        self.spawn_cursor = None
+        self.random_cursors = None
+
+    def park(self):
+        """Reset the state which only lasts until the player disconnects."""
+        self.reset()
+        self.random_mode = True
+
+
+class ParkedRecords(OrderedDict):
+    """Class used to store the records of disconnected players as uniqueid => `PlayerRecord`.
+
+    The store is bounded by `capacity`: parking a record beyond it evicts the least recently parked records.
+    Parking, restoring and evicting are O(1).
+    """
+
+    def __init__(self, capacity):
+        """Object initialization."""
+        # Call OrderedDict's constructor
+        super().__init__()
+
+        # Store the capacity convar
+        self._capacity = capacity
+
+        # Store the amount of records restored and evicted
+        self.restores = 0
+        self.evictions = 0
+
+    def park(self, uniqueid, record):
+        """Park `record`, evicting the least recently parked records beyond capacity."""
+        self[uniqueid] = record
+        self.move_to_end(uniqueid)
+
+        self.trim()
+
+    def restore(self, uniqueid):
+        """Remove and return the record parked for `uniqueid`, or None."""
+        record = self.pop(uniqueid, None)
+
+        if record is not None:
+            self.restores += 1
+
+        return record
+
+    def trim(self):
+        """Evict the least recently parked records beyond capacity."""
+        capacity = self.capacity
+
+        while len(self) > capacity:
+            self.popitem(last=False)
+            self.evictions += 1
+
+    @property
+    def capacity(self):
+        """Return the maximum amount of records kept."""
+        return max(self._capacity.get_int(), 0)
+
 
 # =============================================================================
 # >> PLAYER ENTITY
@@ -138,53 +255,197 @@ class Inventories(defaultdict):
 class PlayerEntity(Player):
     """Class used to provide the following functionality:
 
+        * Cached instances for each player index
         * Respawn
         * Damage Protection
         * Access personal inventories
-        * Access personal random weapons
-        * Access personal spawn points
+        * Access the shared random weapon decks
+        * Access the shared spawn deck
         * Refill weapon ammo
         * Refill weapon clip
     """
 
-    # Store personal player inventories
-    inventories_store = Inventories(lambda: defaultdict(Inventory))
+    # Store cached instances as index => (inthandle, userid, PlayerEntity instance)
+    instances_store = dict()
+
+    # Store the records of connected players as uniqueid => `PlayerRecord`
+    records_store = dict()
+
+    # Store the records of disconnected players with inventories
+    parked_records_store = ParkedRecords(cvar_parked_inventories_capacity)
+
+    @classmethod
+    def cached(cls, index):
+        """Return the cached `PlayerEntity` (subclass) instance for `index`.
+
+        The cached instance is only returned if the entity at `index` still has the same serial number (inthandle)
+        and userid, else a new instance is created and cached. Raise ValueError for invalid player indexes.
+        """
+        instance = cls.instances_store.get(index)
 
-    # Store team changes count for each player
-    team_changes_store = defaultdict(int)
+        if instance is not None:
+            inthandle, userid, player = instance
 
-    # Store personal player spawn points
-    spawn_locations_store = defaultdict(list)
+            if inthandle_from_index(index) == inthandle and userid_from_index(index) == userid:
+                return player
 
-    # Store personal player random weapons
-    random_weapons_store = defaultdict(lambda: {tag: list() for tag in weapon_manager.tags})
+        # Create and cache a new instance
+        player = cls(index)
+        cls.instances_store[index] = (player.inthandle, player.userid, player)
+
+        return player
+
+    @classmethod
+    def cached_from_userid(cls, userid):
+        """Return the cached `PlayerEntity` (subclass) instance for `userid`."""
+        return cls.cached(index_from_userid(userid))
+
+    @classmethod
+    def forget(cls, index):
+        """Drop the cached instance for `index`."""
+        cls.instances_store.pop(index, None)
 
     @classmethod
     def alive(cls):
         """Yield a `PlayerEntity` (subclass) instance for each alive player."""
         for player in PlayerIter('alive'):
-            yield cls(player.index)
+            yield cls.cached(player.index)
 
     @classmethod
     def by_team(cls, team_index):
         """Yield a `PlayerEntity` (subclass) instance for each alive player of team `team_index`."""
         for player in PlayerIter(('alive', 't' if team_index == 2 else 'ct')):
-            yield cls(player.index)
+            yield cls.cached(player.index)
+
+    @classmethod
+    def get_record(cls, uniqueid):
+        """Return the `PlayerRecord` for `uniqueid`, restoring a parked one or loading it from storage."""
+        record = cls.records_store.get(uniqueid)
+
+        if record is None:
+            record = cls.parked_records_store.restore(uniqueid)
+
+            if record is None:
+                record = PlayerRecord()
+
+            cls.records_store[uniqueid] = record
+
+        # Load the stored inventories, until a load has succeeded
+        if not record.loaded:
+            cls.load_record(uniqueid, record)
+
+        return record
+
+    @classmethod
+    def load_record(cls, uniqueid, record):
+        """Fill `record` from storage and write the changes made before, if the stored inventories could be read."""
+        # Bots' records are never persisted
+        if uniqueid.startswith(BOT_UNIQUEID_PREFIX):
+            record.loaded = True
+            return
+
+        if not inventory_storage.load(uniqueid, record):
+            return
+
+        record.loaded = True
+
+        # Write the changes which were held back until the load
+        if record.unsaved:
+            record.unsaved = False
+            inventory_storage.save(uniqueid, record)
+
+    @classmethod
+    def store_record(cls, uniqueid, record):
+        """Queue `record` to be persisted, holding the changes back until the stored inventories have been loaded."""
+        # Bots' records are never persisted
+        if uniqueid.startswith(BOT_UNIQUEID_PREFIX):
+            return
+
+        # Never overwrite the stored inventories with a record which doesn't hold them yet
+        if not record.loaded:
+            record.unsaved = True
+            return
+
+        inventory_storage.save(uniqueid, record)
+
+    @classmethod
+    def park_record(cls, uniqueid):
+        """Park the `PlayerRecord` for `uniqueid` when the player disconnects, evicting it if it has no inventories."""
+        record = cls.records_store.pop(uniqueid, None)
+
+        if record is None or record.inventories.empty:
+            return
+
+        record.park()
+        cls.parked_records_store.park(uniqueid, record)
+
+    @classmethod
+    def all_records(cls):
+        """Yield a (uniqueid, `PlayerRecord`) tuple for all records, connected ones first."""
+        yield from cls.records_store.items()
+        yield from cls.parked_records_store.items()
 
     @classmethod
     def clear_data(cls, keep_inventories=False):
-        cls.team_changes_store.clear()
-        cls.spawn_locations_store.clear()
-        cls.random_weapons_store.clear()
+        """Drop cached instances and reset the state lasting until the end of the map, or evict all records."""
+        cls.instances_store.clear()
 
         if not keep_inventories:
-            cls.inventories_store.clear()
+            cls.records_store.clear()
+            cls.parked_records_store.clear()
+            return
+
+        for record in cls.records_store.values():
+            record.reset()
+
+    @classmethod
+    def reset_all_team_changes(cls):
+        """Reset the team change counts of all players."""
+        for record in cls.records_store.values():
+            record.team_changes = 0
+
+    @classmethod
+    def drop_removed_weapons(cls):
+        """Drop inventory items of weapons which have been removed (or moved to another tag) & refresh random weapons.
+
+        Return the amount of inventory items dropped.
+        """
+        dropped = 0
+
+        for uniqueid, record in cls.all_records():
+            tags_dropped = 0
+
+            for inventory in record.inventories.values():
+
+                # Get the tags of invalid inventory items
+                tags = [
+                    tag for tag, inventory_item in inventory.items()
+                    if inventory_item.weapon_id is None or inventory_item.data is None or inventory_item.data.tag != tag
+                ]
+
+                # Drop them
+                for tag in tags:
+                    del inventory[tag]
+
+                tags_dropped += len(tags)
+
+            # Persist the changed record
+            if tags_dropped:
+                cls.store_record(uniqueid, record)
+                dropped += tags_dropped
+
+        # Start over in the rebuilt random weapon decks
+        for record in cls.records_store.values():
+            record.random_cursors = None
+
+        # Return the amount of inventory items dropped
+        return dropped
 
     @classmethod
     def respawn(cls, index):
         """Respawn a player if they are still connected."""
         with contextlib.suppress(ValueError):
-            cls(index).spawn(True)
+            cls.cached(index).spawn(True)
 
     @classmethod
     def disable_damage_protection(cls, index):
@@ -192,7 +453,7 @@ class PlayerEntity(Player):
         with contextlib.suppress(ValueError):
 
             # Get a PlayerEntity instance for the player index
-            player = cls(index)
+            player = cls.cached(index)
 
             # Disable god mode
             player.godmode = False
@@ -201,10 +462,10 @@ class PlayerEntity(Player):
             player.color = WHITE
 
     @classmethod
-    def reset_team_changes(cls, userid):
-        """Reset the player's team change count."""
-        if userid in cls.team_changes_store:
-            del cls.team_changes_store[userid]
+    def reset_team_changes(cls, index):
+        """Reset the player's team change count if the player is still connected."""
+        with contextlib.suppress(ValueError):
+            cls.cached(index).record.team_changes = 0
 
     def tell(self, message):
         """Send the player a prefixed chat message."""
@@ -218,24 +479,41 @@ class PlayerEntity(Player):
         #  see https://github.com/GunGame-Dev-Team/GunGame-SP/commit/bc3e7ab3630a5e3680ff35d726e810370b86a5ea
         #  and https://forums.sourcepython.com/viewtopic.php?f=31&t=1597
 
-        # Give the player the weapon entity
-        weapon = make_object(Weapon, self.give_named_item(name))
+        # Get whether the weapon is known to need a team flip for the player's team
+        team = self.team
+        team_flip = classname_collisions.needs_team_flip(team, name)
+
+        # Give the player the weapon entity the way that worked before
+        weapon = self._give_named_weapon(name, team_flip)
 
-        # Return it if it doesn't share its classname with another weapon
-        if weapon.classname == weapon.weapon_name:
+        # Return it if it is the weapon asked for
+        if weapon.weapon_name == name:
             return weapon
 
-        # Remove it, if it does
+        # Remove it, if it isn't
         weapon.remove()
 
-        # Switch the player's team and give the weapon entity again
-        self.team_index = 5 - self.team
+        # Give the weapon entity again the other way
+        weapon = self._give_named_weapon(name, not team_flip)
+
+        # Remember the way which worked
+        if weapon.weapon_name == name:
+            classname_collisions.learn(team, name, not team_flip)
+
+        # Return the correct weapon entity
+        return weapon
+
+    def _give_named_weapon(self, name, team_flip):
+        """Give the player the weapon entity, switching the player's team for it if `team_flip` is True."""
+        if team_flip:
+            self.team_index = 5 - self.team
+
         weapon = make_object(Weapon, self.give_named_item(name))
 
         # Reset the player's team
-        self.team_index = 5 - self.team
+        if team_flip:
+            self.team_index = 5 - self.team
 
-        # Return the correct weapon entity
         return weapon
 
     def equip_weapon(self, weapon_name):
@@ -281,7 +559,7 @@ class PlayerEntity(Player):
         else:
             weapon_data = weapon_manager.by_name(weapon.weapon_name)
 
-            if weapon_data.name != inventory_item.data.name or weapon_data.has_silencer:
+            if weapon_data is None or weapon_data.id != inventory_item.weapon_id or weapon_data.has_silencer:
                 weapon.remove()
                 self.equip_weapon(inventory_item.data.name)
 
@@ -298,9 +576,33 @@ class PlayerEntity(Player):
         self.strip()
 
         # Equip random weapons
-        for tag in self.random_weapons.keys():
+        for tag in weapon_manager.tags:
             self.equip_random_weapon(tag)
 
+    def replace_removed_weapons(self):
+        """Replace the equipped weapons which have been removed from the weapon data file."""
+        # Equip random weapons if the player's inventory items have all been dropped
+        if not self.random_mode and not self.inventory:
+            self.equip_random_weapons()
+            return
+
+        for tag in weapon_manager.tags:
+            weapon = self.get_weapon(is_filters=tag)
+
+            if weapon is None or weapon_manager.by_name(weapon.weapon_name) is not None:
+                continue
+
+            # Remove the weapon
+            weapon.remove()
+
+            # Equip a random weapon if the player has random mode activated
+            if self.random_mode:
+                self.equip_random_weapon(tag)
+
+            # Else, equip the player's inventory item for the tag
+            elif tag in self.inventory:
+                self.equip_inventory_item(tag)
+
     def weapon_dropped(self):
         """Handle removing the player's active weapon from their inventory if it has been dropped."""
         if self.active_weapon is not None:
@@ -320,6 +622,7 @@ class PlayerEntity(Player):
                 # Else, equip random weapons of the player's inventory is empty
                 else:
                     self.inventory.remove_inventory_item(self, weapon_data.tag)
+                    self.save_record()
 
                     if not self.inventory:
                         self.equip_random_weapons()
@@ -336,7 +639,8 @@ class PlayerEntity(Player):
             weapon_data = weapon_manager[weapon_basename]
 
             # Add the weapon to the player's inventory
-            self.inventory.add_inventory_item(weapon_basename, weapon_data)
+            self.inventory.add_inventory_item(weapon_data)
+            self.save_record()
 
             # Equip the player with the weapon if the player is alive and on a team
             if not self.dead and self.team_index > 1:
@@ -344,9 +648,12 @@ class PlayerEntity(Player):
 
     def inventory_item_by_weapon_name(self, weapon_name):
         """Return the player's inventory item for the given weapon name."""
-        for inventory_item in self.inventory.values():
-            if inventory_item.data.name == weapon_name:
-                return inventory_item
+        weapon_data = weapon_manager.by_name(weapon_name)
+
+        if weapon_data is not None:
+            for inventory_item in self.inventory.values():
+                if inventory_item.weapon_id == weapon_data.id:
+                    return inventory_item
 
         # Return None if no inventory item has been found
         return None
@@ -359,7 +666,7 @@ class PlayerEntity(Player):
     def enable_damage_protection(self, time_delay=None):
         """Enable damage protection and disable it after `time_delay` if `time_delay` is not None."""
         # Cancel the damage protection delay for the player
-        delay_manager.cancel(f'protect_{self.userid}')
+        delay_manager.cancel(('protect', self.index))
 
         # Enable god mode
         self.godmode = True
@@ -370,7 +677,7 @@ class PlayerEntity(Player):
         # Disable protection after `time_delay`
         if time_delay is not None:
             delay_manager(
-                f'protect_{self.userid}', time_delay, PlayerEntity.disable_damage_protection, (self.index, ),
+                ('protect', self.index), time_delay, PlayerEntity.disable_damage_protection, (self.index, ),
                 call_on_cancel=True
             )
 
@@ -379,56 +686,60 @@ class PlayerEntity(Player):
         # Get the weapon's data
         weapon_data = weapon_manager.by_name(self.active_weapon.weapon_name)
 
+        # Refill only valid weapons
+        if weapon_data is None:
+            return
+
         # Add up the weapon's ammo
         self.active_weapon.ammo = weapon_data.maxammo - self.active_weapon.clip + weapon_data.clip + clip_fix
 
     def refill_clip(self, weapon_data):
         """Restore the player's active weapon's clip."""
         delay_manager(
-            f'refill_clip_{self.active_weapon.index}', 0.1,
+            ('refill_clip', self.active_weapon.index), 0.1,
             self.active_weapon.set_clip, (weapon_data.clip,)
         )
 
     def get_random_weapon(self, tag):
-        """Return a random weapon for the given weapon tag."""
-        return self.random_weapons[tag].pop()
+        """Return a random weapon name for the given weapon tag."""
+        return weapon_manager.by_id(random_weapon_decks.draw(tag, self.random_cursors)).name
 
     @property
-    def random_weapons(self):
-        """Return personal random weapons for the player."""
-        # Get the player's personal random weapon map
-        random_weapons = self.random_weapons_store[self.userid]
-
-        # Iterate through it
-        for tag, weapon_list in random_weapons.items():
+    def random_cursors(self):
+        """Return the player's cursors into the shared random weapon decks, starting at random positions."""
+        record = self.record
 
-            # Fill in all weapons of `tag` in shuffled form if the tag's weapon list is empty
-            if not weapon_list:
-                weapon_list.extend([weapon_data.name for weapon_data in weapon_manager.by_tag(tag)])
-                random.shuffle(weapon_list)
+        if record.random_cursors is None:
+            record.random_cursors = random_weapon_decks.new_cursors()
 
-        # Return it
-        return random_weapons
+        return record.random_cursors
 
     def get_spawn_location(self):
         """Return a unique spawn location for the player."""
-        # Get a list of current player origins
-        player_origins = [player.origin for player in PlayerEntity.alive() if player.userid != self.userid]
+        # Get the snapshot of alive player origins for the current tick
+        player_snapshot.refresh()
+
+        # Draw the next free spawn point from the shared spawn deck, if there are any other players around
+        if player_snapshot.has_others(self.userid):
+            userid, team = self.userid, self.team
 
-        # Loop through all the player's spawn points
-        for spawn_location in self.spawn_locations.copy():
+            # Get the score function for the configured spawn mode
+            score = (lambda index: spawn_scorer.score(index, team)) if cvar_spawn_mode.get_int() == 1 else None
 
-            # Calculate the distances between the spawn point and all player origins
-            distances = [origin.get_distance(spawn_location) for origin in player_origins]
+            # Get the checks for free spawn points, the strictest first
+            checks = [lambda index: player_snapshot.is_free(index, userid)]
 
-            # Continue if there is enough space around the spawn point
-            if distances and min(distances) >= SAFE_SPAWN_DISTANCE:
+            if cvar_spawn_visibility_checks.get_int() > 0:
+                checks.insert(0, lambda index: (
+                    player_snapshot.is_free(index, userid) and not spawn_visibility.is_exposed(index, team)
+                ))
 
-                # Remove the spawn point from the player's spawn points list
-                self.spawn_locations.remove(spawn_location)
+            for is_free in checks:
+                index, self.spawn_cursor = spawn_location_manager.deck.draw(self.spawn_cursor, is_free, score)
 
                 # Return the spawn point found
-                return spawn_location
+                if index is not None:
+                    return spawn_location_manager[index]
 
         # Return the player's current location as a spawn point if no spawn point has been found
         return SpawnLocation.from_player_location(self)
@@ -441,19 +752,24 @@ class PlayerEntity(Player):
         # Move the player to the spawn point found
         spawn_location.move_player(self)
 
-    @property
-    def spawn_locations(self):
-        """Return personal spawn locations for the player."""
-        # Get the player's personal spawn locations list
-        spawn_locations = self.spawn_locations_store[self.userid]
+        # Let further spawn location checks in this tick know about the player's new location
+        player_snapshot.move(self.userid, self.team, spawn_location.x, spawn_location.y, spawn_location.z)
+
+    def set_spawn_cursor(self, value):
+        """Store the player's position in the shared spawn deck."""
+        self.record.spawn_cursor = value
+
+    def get_spawn_cursor(self):
+        """Return the player's position in the shared spawn deck, starting at a random position."""
+        record = self.record
+
+        if record.spawn_cursor is None:
+            record.spawn_cursor = spawn_location_manager.deck.new_cursor()
 
-        # Fill in spawn points in shuffled form if it is empty
-        if not spawn_locations:
-            spawn_locations.extend(spawn_location_manager)
-            random.shuffle(spawn_locations)
+        return record.spawn_cursor
 
-        # Return it
-        return spawn_locations
+    # Set the `spawn_cursor` property for PlayerEntity
+    spawn_cursor = property(get_spawn_cursor, set_spawn_cursor)
 
     def team_changed(self, team_index):
         self.team = team_index
@@ -467,8 +783,8 @@ class PlayerEntity(Player):
             penalty_seconds = abs(cvar_team_changes_reset_delay.get_float()) * 60.0
 
             delay_manager(
-                f'reset_team_changes_{self.userid}', penalty_seconds,
-                PlayerEntity.reset_team_changes, (self.userid,)
+                ('reset_team_changes', self.index), penalty_seconds,
+                PlayerEntity.reset_team_changes, (self.index,)
             )
 
             penalty_start = datetime.datetime.now()
@@ -498,51 +814,62 @@ class PlayerEntity(Player):
 
         # Respawn the player after the respawn delay
         delay_manager(
-            f'respawn_{self.userid}', abs(cvar_respawn_delay.get_float()), PlayerEntity.respawn, (self.index,)
+            ('respawn', self.index), abs(cvar_respawn_delay.get_float()), PlayerEntity.respawn, (self.index,)
         )
 
     def set_team_changes(self, value):
         """Store `value` as the team change count for the player."""
-        self.team_changes_store[self.uniqueid] = value
+        self.record.team_changes = value
 
     def get_team_changes(self):
         """Return the team change count for the player."""
-        return self.team_changes_store[self.uniqueid]
+        return self.record.team_changes
 
     # Set the `team_changes` property for PlayerEntity
     team_changes = property(get_team_changes, set_team_changes)
 
     def set_inventory_selection(self, inventory_index):
         """Set the player's inventory selection to `inventory_index`."""
-        self.inventories_store.selections[self.uniqueid] = inventory_index
+        self.record.selection = inventory_index
+        self.save_record()
 
     def get_inventory_selection(self):
         """Return the player's current inventory selection."""
-        return self.inventories_store.selections[self.uniqueid]
+        return self.record.selection
 
     # Set the `inventory_selection` property for PlayerEntity
     inventory_selection = property(get_inventory_selection, set_inventory_selection)
 
     def set_random_mode(self, value):
         """Set random mode for the player."""
-        self.inventories_store.selections_random[self.userid] = value
+        self.record.random_mode = value
 
     def get_random_mode(self):
         """Return whether the player is currently in random mode."""
-        return self.inventories_store.selections_random[self.userid]
+        return self.record.random_mode
 
     # Set the `random_mode` property for PlayerEntity
     random_mode = property(get_random_mode, set_random_mode)
 
+    @property
+    def record(self):
+        """Return the player's `PlayerRecord`."""
+        return self.get_record(self.uniqueid)
+
+    def save_record(self):
+        """Queue the player's inventories and inventory selection to be persisted."""
+        self.store_record(self.uniqueid, self.record)
+
     @property
     def inventories(self):
         """Return the player's inventories."""
-        return self.inventories_store[self.uniqueid]
+        return self.record.inventories
 
     @property
     def inventory(self):
         """Return the player's current inventory."""
-        return self.inventories[self.inventory_selection]
+        record = self.record
+        return record.inventories[record.selection]
 
     @property
     def carries_inventory(self):
@@ -12,19 +12,30 @@ import json
 # Source.Python Imports
 #   Core
 from core import GAME_NAME
+#   Cvars
+from cvars import cvar
 #   Engines
 from engines.server import global_vars
 #   Listeners
+from listeners import OnConVarChanged
 from listeners import OnLevelInit
 #   Mathlib
 from mathlib import QAngle
 from mathlib import Vector
 #   Paths
+from paths import GAME_PATH
 from paths import PLUGIN_DATA_PATH
 
 # Script Imports
+#   Config
+from udm.config import cvar_spawn_reservation_cooldown
 #   Info
 from udm.info import info
+#   Spawn Locations
+from udm.spawn_locations.compiled import CompiledSpawnLocationFile
+from udm.spawn_locations.deck import SpawnDeck
+from udm.spawn_locations.grid import SpawnLocationGrid
+from udm.spawn_locations.prefetch import SpawnLocationPrefetcher
 
 
 # =============================================================================
@@ -33,6 +44,9 @@ from udm.info import info
 # Safe distance between spawn points (in units)
 SAFE_SPAWN_DISTANCE = 150.0
 
+# Amount of maps to keep spawn locations in memory for
+SPAWN_LOCATION_CACHE_SIZE = 8
+
 
 # =============================================================================
 # >> CLASSES
@@ -75,26 +89,72 @@ class SpawnLocation(Vector):
 class SpawnLocationManager(list):
     """Class used to provide spawn point managing functionality:
 
-        * load spawn points from a JSON file
+        * load spawn points from a JSON file (through its compiled form)
         * save spawn points to a JSON file
+        * prefetch spawn points for likely next maps and keep recently played maps in memory
     """
 
     # Store the spawn points data path
     path = PLUGIN_DATA_PATH.joinpath(info.name, 'spawn_locations', GAME_NAME)
 
+    def __init__(self):
+        """Object initialization."""
+        # Call list's constructor
+        super().__init__()
+
+        # Store a spatial index over the spawn locations
+        self._grid = SpawnLocationGrid(SAFE_SPAWN_DISTANCE)
+
+        # Store a shared deck of spawn location indexes
+        self._deck = SpawnDeck(cvar_spawn_reservation_cooldown)
+
+        # Store a version number which changes whenever the spatial index has been rebuilt
+        self._version = 0
+
+        # Store the prefetcher for spawn locations of likely next maps
+        self._prefetcher = SpawnLocationPrefetcher(SPAWN_LOCATION_CACHE_SIZE, self.build)
+
+    @staticmethod
+    def build(json_file):
+        """Return a list of `SpawnLocation` objects read from the compiled form of `json_file`."""
+        return [
+            SpawnLocation(x, y, z, QAngle(pitch, yaw, roll))
+            for x, y, z, pitch, yaw, roll in CompiledSpawnLocationFile(json_file).load()
+        ]
+
+    def rebuild_index(self):
+        """Rebuild the spatial index and the spawn deck after spawn locations have been added or removed."""
+        self._grid.rebuild(self)
+        self._deck.rebuild(len(self))
+        self._version += 1
+
+    def near(self, x, y, z):
+        """Yield the index of each spawn location closer than `SAFE_SPAWN_DISTANCE` to the given coordinates."""
+        return self._grid.near(x, y, z)
+
+    def occupied(self, origins):
+        """Return a set of spawn location indexes which have any of `origins` closer than `SAFE_SPAWN_DISTANCE`."""
+        return self._grid.occupied(origins)
+
     def load(self):
         """Load spawn points from the spawn points data file for the current map."""
-        # Skip if the file doesn't exist
-        if not self.json_file.exists():
-            return
+        # Swap in the prefetched spawn points, if they have been prefetched or recently played
+        spawn_locations = self._prefetcher.get(self.json_file)
+
+        # Else, read the compiled spawn points data file into memory and keep it in the cache
+        if spawn_locations is None:
+            spawn_locations = self.build(self.json_file)
+            self._prefetcher.put(self.json_file, spawn_locations)
 
-        # Read the spawn points data file into memory
-        with self.json_file.open() as f:
-            contents = json.load(f)
+        # Add them all to this list
+        self.extend(spawn_locations)
 
-        # Append each entry as a `SpawnPoint` object
-        for data in contents:
-            self.append(SpawnLocation(*data['vector'], QAngle(*data['angle'])))
+        # Rebuild the spatial index
+        self.rebuild_index()
+
+    def prefetch(self, map_names):
+        """Load spawn points for `map_names` on a worker thread."""
+        self._prefetcher.prefetch([self.json_file_for(map_name) for map_name in map_names])
 
     def save(self):
         """Save spawn points to the spawn points data file for the current map."""
@@ -106,13 +166,76 @@ class SpawnLocationManager(list):
         with self.json_file.open('w') as f:
             json.dump([spawnpoint.json for spawnpoint in self], f, indent=4)
 
+        # Compile the new spawn points data file
+        CompiledSpawnLocationFile(self.json_file).compile()
+
+        # Keep the saved spawn points in the cache
+        self._prefetcher.put(self.json_file, self)
+
+    @property
+    def coordinates(self):
+        """Return a list of (x, y, z) tuples, one for each spawn location index."""
+        return self._grid.coordinates
+
+    @property
+    def deck(self):
+        """Return the shared spawn deck."""
+        return self._deck
+
+    @property
+    def version(self):
+        """Return the version number of the spatial index."""
+        return self._version
+
     @property
     def json_file(self):
         """Return the path to the JSON file for the current map."""
         if not self.path.exists():
             self.path.makedirs()
 
-        return self.path.joinpath(f'{global_vars.map_name}.json')
+        return self.json_file_for(global_vars.map_name)
+
+    def json_file_for(self, map_name):
+        """Return the path to the JSON file for `map_name`."""
+        return self.path.joinpath(f'{map_name}.json')
+
+
+# =============================================================================
+# >> HELPER FUNCTIONS
+# =============================================================================
+def get_next_map_names(map_name):
+    """Return a list of likely next maps, taken from the `nextlevel` convar and the mapcycle."""
+    map_names = list()
+
+    # Add the map set by `nextlevel`
+    nextlevel = cvar.find_var('nextlevel')
+
+    if nextlevel is not None and nextlevel.get_string():
+        map_names.append(nextlevel.get_string())
+
+    # Get the mapcycle file name
+    mapcyclefile = cvar.find_var('mapcyclefile')
+    mapcycle_name = mapcyclefile.get_string() if mapcyclefile is not None else 'mapcycle.txt'
+
+    for path in (GAME_PATH.joinpath('cfg', mapcycle_name), GAME_PATH.joinpath(mapcycle_name)):
+        if not path.isfile():
+            continue
+
+        # Read all map names, ignoring comments and empty lines
+        with path.open() as f:
+            mapcycle = [line.split('//')[0].strip() for line in f]
+
+        mapcycle = [name for name in mapcycle if name]
+
+        # Add the map following `map_name`, or the first one if `map_name` is not part of the mapcycle
+        if mapcycle:
+            next_index = mapcycle.index(map_name) + 1 if map_name in mapcycle else 0
+            map_names.append(mapcycle[next_index % len(mapcycle)])
+
+        break
+
+    # Return the map names without duplicates
+    return [name for index, name in enumerate(map_names) if name not in map_names[:index]]
 
 
 # =============================================================================
@@ -130,6 +253,14 @@ spawn_location_manager.load()
 # =============================================================================
 @OnLevelInit
 def on_level_init(map_name):
-    """Reload spawn points."""
+    """Reload spawn points and prefetch spawn points for likely next maps."""
     spawn_location_manager.clear()
     spawn_location_manager.load()
+    spawn_location_manager.prefetch(get_next_map_names(map_name))
+
+
+@OnConVarChanged
+def on_convar_changed(convar, old_value):
+    """Prefetch spawn points for the map set by `nextlevel`."""
+    if convar.name == 'nextlevel' and convar.get_string():
+        spawn_location_manager.prefetch([convar.get_string()])
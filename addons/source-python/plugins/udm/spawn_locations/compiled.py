@@ -0,0 +1,145 @@
+# ../udm/spawn_locations/compiled.py
+
+"""Provides a compiled binary cache for spawn location JSON files."""
+
+# =============================================================================
+# >> IMPORTS
+# =============================================================================
+# Python Imports
+#   Contextlib
+import contextlib
+#   Hashlib
+import hashlib
+#   JSON
+import json
+#   Mmap
+import mmap
+#   OS
+import os
+#   Struct
+import struct
+
+
+# =============================================================================
+# >> CLASSES
+# =============================================================================
+class CompiledSpawnLocationFile(object):
+    """Class used to read and write the compiled form of a spawn locations JSON file.
+
+    The compiled file is stored next to the JSON file and consists of
+
+        * a header: magic, format version, JSON mtime, record count and the SHA-1 hash of the JSON file
+        * one record of packed float32 values (x, y, z, pitch, yaw, roll) per spawn location
+
+    The JSON file stays the editable source of truth: the compiled file is regenerated
+    whenever the JSON file's mtime and hash no longer match the header.
+    """
+
+    # Store the file format identification
+    magic = b'UDMS'
+    version = 1
+
+    # Store the binary layouts
+    header = struct.Struct('<4sHdI20s')
+    record = struct.Struct('<6f')
+
+    def __init__(self, json_file):
+        """Object initialization."""
+        # Store the path to the JSON file
+        self._json_file = str(json_file)
+
+        # Store the path to the compiled file
+        self._path = os.path.splitext(self._json_file)[0] + '.bin'
+
+    def load(self):
+        """Return a list of (x, y, z, pitch, yaw, roll) tuples, compiling the JSON file if required."""
+        # Return nothing if the JSON file doesn't exist
+        if not os.path.isfile(self._json_file):
+            return list()
+
+        # Get the JSON file's mtime
+        mtime = os.path.getmtime(self._json_file)
+
+        # Read the compiled file, if it is up to date
+        records = self._read(mtime)
+
+        if records is not None:
+            return records
+
+        # Else, compile the JSON file
+        return self.compile()
+
+    def compile(self):
+        """Compile the JSON file and return its records."""
+        with open(self._json_file, 'rb') as f:
+            contents = f.read()
+
+        # Convert the JSON entries into records
+        records = [tuple(data['vector']) + tuple(data['angle']) for data in json.loads(contents.decode('utf-8'))]
+
+        # Write the compiled file
+        self._write(records, os.path.getmtime(self._json_file), hashlib.sha1(contents).digest())
+
+        # Return the records
+        return records
+
+    def _read(self, mtime):
+        """Return the records of the compiled file, or None if it is missing or outdated."""
+        try:
+            with open(self._path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+
+                # Validate the header
+                if len(buffer) < self.header.size:
+                    return None
+
+                magic, version, compiled_mtime, count, digest = self.header.unpack_from(buffer)
+
+                if magic != self.magic or version != self.version:
+                    return None
+
+                if len(buffer) != self.header.size + count * self.record.size:
+                    return None
+
+                # Compare the hashes, if the JSON file has been touched since it was compiled
+                if compiled_mtime != mtime:
+                    with open(self._json_file, 'rb') as json_file:
+                        if hashlib.sha1(json_file.read()).digest() != digest:
+                            return None
+
+                    # Only the mtime has changed: remember the new one
+                    update_mtime = True
+                else:
+                    update_mtime = False
+
+                # Unpack all records
+                records = list(self.record.iter_unpack(buffer[self.header.size:]))
+
+        except (OSError, ValueError):
+            return None
+
+        # Store the new mtime
+        if update_mtime:
+            with contextlib.suppress(OSError), open(self._path, 'r+b') as f:
+                f.write(self.header.pack(self.magic, self.version, mtime, count, digest))
+
+        # Return the records
+        return records
+
+    def _write(self, records, mtime, digest):
+        """Write `records` to the compiled file."""
+        temporary_path = f'{self._path}.tmp'
+
+        with contextlib.suppress(OSError):
+            with open(temporary_path, 'wb') as f:
+                f.write(self.header.pack(self.magic, self.version, mtime, len(records), digest))
+
+                for record in records:
+                    f.write(self.record.pack(*record))
+
+            # Replace the compiled file in one step
+            os.replace(temporary_path, self._path)
+
+    @property
+    def path(self):
+        """Return the path to the compiled file."""
+        return self._path
@@ -0,0 +1,103 @@
+# ../udm/spawn_locations/deck.py
+
+"""Provides a shared, shuffled deck of spawn location indexes with short-lived reservations."""
+
+# =============================================================================
+# >> IMPORTS
+# =============================================================================
+# Python Imports
+#   Array
+from array import array
+#   Random
+import random
+#   Time
+import time
+
+
+# =============================================================================
+# >> CLASSES
+# =============================================================================
+class SpawnDeck(object):
+    """Class used to hand out spawn location indexes from one shuffled deck shared by all players.
+
+        * each player only keeps a cursor (a position in the deck)
+        * a spawn location which has just been handed out is reserved for `cooldown` seconds
+    """
+
+    def __init__(self, cooldown):
+        """Object initialization."""
+        # Store the cooldown convar
+        self._cooldown = cooldown
+
+        # Store the shuffled spawn location indexes
+        self._order = array('H')
+
+        # Store the time until each spawn location is reserved
+        self._reserved_until = array('d')
+
+    def __len__(self):
+        """Return the amount of spawn locations in the deck."""
+        return len(self._order)
+
+    def rebuild(self, count):
+        """Shuffle a new deck for `count` spawn locations and drop all reservations."""
+        order = list(range(count))
+        random.shuffle(order)
+
+        self._order = array('H', order)
+        self._reserved_until = array('d', bytes(8 * count))
+
+    def new_cursor(self):
+        """Return a random start position in the deck."""
+        return random.randrange(len(self._order)) if self._order else 0
+
+    def draw(self, cursor, is_free, score=None):
+        """Return a tuple of the next free spawn location index and the advanced cursor.
+
+        If `score` is given, the free spawn location with the highest score is drawn instead of the first one.
+        The index is None if every spawn location is either reserved or not free.
+        """
+        count = len(self._order)
+        now = time.time()
+
+        # Store the best candidate as (score, position)
+        best = None
+
+        for step in range(count):
+            position = (cursor + step) % count
+            index = self._order[position]
+
+            # Skip spawn locations which have just been handed out
+            if self._reserved_until[index] > now:
+                continue
+
+            # Skip spawn locations which are not free
+            if not is_free(index):
+                continue
+
+            # Take the first free spawn location if there is no score
+            if score is None:
+                best = (None, position)
+                break
+
+            # Else, remember the spawn location with the highest score
+            candidate_score = score(index)
+
+            if best is None or candidate_score > best[0]:
+                best = (candidate_score, position)
+
+        # Return no index and keep the cursor if no spawn location has been found
+        if best is None:
+            return None, cursor
+
+        # Reserve the spawn location
+        index = self._order[best[1]]
+        self._reserved_until[index] = now + self.cooldown
+
+        # Return the index and the position after it
+        return index, best[1] + 1
+
+    @property
+    def cooldown(self):
+        """Return the reservation cooldown (in seconds)."""
+        return abs(self._cooldown.get_float())
@@ -0,0 +1,87 @@
+# ../udm/spawn_locations/grid.py
+
+"""Provides a uniform grid for fast proximity queries on spawn locations."""
+
+# =============================================================================
+# >> CLASSES
+# =============================================================================
+class SpawnLocationGrid(dict):
+    """Class used to bucket spawn location indexes into cubic cells of `cell_size` units.
+
+        * cell keys are (x, y, z) tuples of integer cell coordinates
+        * cell values are lists of spawn location indexes
+    """
+
+    # Store the offsets of a cell and all of its 26 neighbors
+    neighbor_offsets = tuple(
+        (x, y, z) for x in (-1, 0, 1) for y in (-1, 0, 1) for z in (-1, 0, 1)
+    )
+
+    def __init__(self, cell_size):
+        """Object initialization."""
+        # Call dict's constructor
+        super().__init__()
+
+        # Store the cell size
+        self._cell_size = float(cell_size)
+
+        # Store the squared cell size for distance comparisons
+        self._cell_size_squared = self._cell_size ** 2
+
+        # Store the coordinates of each spawn location as (x, y, z) tuples
+        self._coordinates = list()
+
+    def rebuild(self, spawn_locations):
+        """Rebuild the grid from `spawn_locations`."""
+        self.clear()
+
+        # Cache the coordinates as plain floats, so queries don't touch Vector objects
+        self._coordinates = [(location.x, location.y, location.z) for location in spawn_locations]
+
+        # Bucket each spawn location index into its cell
+        for index, coordinates in enumerate(self._coordinates):
+            self.setdefault(self.cell(*coordinates), list()).append(index)
+
+    def add(self, x, y, z):
+        """Add a spawn location at the given coordinates and return its index."""
+        index = len(self._coordinates)
+        self._coordinates.append((x, y, z))
+        self.setdefault(self.cell(x, y, z), list()).append(index)
+
+        return index
+
+    def cell(self, x, y, z):
+        """Return the cell key for the given coordinates."""
+        cell_size = self._cell_size
+        return int(x // cell_size), int(y // cell_size), int(z // cell_size)
+
+    def near(self, x, y, z):
+        """Yield the index of each spawn location closer than `cell_size` units to the given coordinates."""
+        cell_x, cell_y, cell_z = self.cell(x, y, z)
+        coordinates = self._coordinates
+
+        for offset_x, offset_y, offset_z in self.neighbor_offsets:
+            for index in self.get((cell_x + offset_x, cell_y + offset_y, cell_z + offset_z), ()):
+                spawn_x, spawn_y, spawn_z = coordinates[index]
+
+                if (spawn_x - x) ** 2 + (spawn_y - y) ** 2 + (spawn_z - z) ** 2 < self._cell_size_squared:
+                    yield index
+
+    def occupied(self, origins):
+        """Return a set of spawn location indexes which have any of `origins` closer than `cell_size` units."""
+        indexes = set()
+
+        for origin in origins:
+            indexes.update(self.near(*origin))
+
+        return indexes
+
+    @property
+    def coordinates(self):
+        """Return a list of (x, y, z) tuples, one for each spawn location index."""
+        return self._coordinates
+
+    @property
+    def cell_size(self):
+        """Return the cell size."""
+        return self._cell_size
@@ -19,9 +19,9 @@ from udm.admin import admin_menu
 #   Players
 from udm.players import PlayerEntity
 #   Spawn Locations
-from udm.spawn_locations import SAFE_SPAWN_DISTANCE
 from udm.spawn_locations import spawn_location_manager
 from udm.spawn_locations import SpawnLocation
+from udm.spawn_locations.recorder import spawn_location_recorder
 
 
 # =============================================================================
@@ -36,14 +36,17 @@ SPAWN_LOCATION_TOLERANCE_UNITS = 20.0
 # =============================================================================
 def add_spawn_location_at_player_location(player):
     """Add a the player's current location as a spawn location."""
-    # Get a list of the distance of all spawn locations to the player's current location
-    distances = [spawn_location.get_distance(player.origin) for spawn_location in spawn_location_manager]
+    # Get the indexes of all spawn locations which are too close to the player's current location
+    occupied = spawn_location_manager.occupied([(player.origin.x, player.origin.y, player.origin.z)])
 
     # Add the player's current location, if it is far enough away from all other spawn locations
-    if not distances or min(distances) >= SAFE_SPAWN_DISTANCE:
+    if not occupied:
         spawn_location = SpawnLocation.from_player_location(player)
         spawn_location_manager.append(spawn_location)
 
+        # Update the spatial index and the spawn deck
+        spawn_location_manager.rebuild_index()
+
         # Tell the player about the addition
         player.tell(
             f'Spawn Location {MESSAGE_COLOR_WHITE}#{len(spawn_location_manager)} {MESSAGE_COLOR_ORANGE}has been added.'
@@ -78,6 +81,9 @@ def remove_spawn_location_at_player_location(player):
         # Remove it from the spawn location list
         spawn_location_manager.remove(spawn_location)
 
+        # Update the spatial index and the spawn deck
+        spawn_location_manager.rebuild_index()
+
         # Tell the player about the removal
         player.tell(
             f'Spawn Location {MESSAGE_COLOR_WHITE}#{position} {MESSAGE_COLOR_ORANGE}has been removed.'
@@ -92,6 +98,46 @@ def send_spawn_location_list_to_player(player):
     spawn_location_list_menu.send(player.index)
 
 
+def toggle_spawn_location_recording(player):
+    """Start or stop sampling player locations for spawn location generation."""
+    if spawn_location_recorder.recording:
+        spawn_location_recorder.stop()
+
+        # Tell the player about it
+        player.tell(
+            f'Recording has been stopped after {MESSAGE_COLOR_WHITE}{len(spawn_location_recorder)} '
+            f'{MESSAGE_COLOR_ORANGE}samples.'
+        )
+
+    else:
+        spawn_location_recorder.start()
+
+        # Tell the player about it
+        player.tell('Recording player locations...')
+
+    # Send the spawn location manager menu back to the player
+    spawn_location_manager_menu.send(player.index)
+
+
+def generate_spawn_locations(player):
+    """Add spawn locations generated from the recorded player locations."""
+    spawn_locations = spawn_location_recorder.generate()
+
+    if spawn_locations:
+        spawn_location_manager.extend(spawn_locations)
+
+        # Update the spatial index and the spawn deck
+        spawn_location_manager.rebuild_index()
+
+    # Tell the player about the addition
+    player.tell(
+        f'{MESSAGE_COLOR_WHITE}{len(spawn_locations)} {MESSAGE_COLOR_ORANGE}Spawn Locations have been generated.'
+    )
+
+    # Send the spawn location manager menu back to the player
+    spawn_location_manager_menu.send(player.index)
+
+
 def save_spawn_locations(player):
     """Save current spawn locations to file."""
     spawn_location_manager.save()
@@ -111,6 +157,9 @@ spawn_location_manager_menu = PagedMenu(
         ' ',
         PagedOption('List', send_spawn_location_list_to_player),
         ' ',
+        PagedOption('Record', toggle_spawn_location_recording),
+        PagedOption('Generate', generate_spawn_locations),
+        ' ',
         PagedOption('Save', save_spawn_locations)
     ], title='Spawn Location Manager'
 )
@@ -139,7 +188,7 @@ def on_spawn_location_list_menu_build(menu, player_index):
 def on_spawn_location_list_menu_select(menu, player_index, option):
     """Spawn the player at the selected location."""
     # Get a PlayerEntity instance for the player
-    player = PlayerEntity(player_index)
+    player = PlayerEntity.cached(player_index)
 
     # Move player to the chosen spawn location
     option.value.move_player(player)
@@ -161,7 +210,7 @@ def on_spawn_location_list_menu_close(menu, player_index):
 def on_spawn_location_manager_menu_select(menu, player_index, option):
     """Handle the selected option."""
     # Get a PlayerEntity instance for the player
-    player = PlayerEntity(player_index)
+    player = PlayerEntity.cached(player_index)
 
     # Call the callback function from `option` on `player`
     option.value(player)
@@ -0,0 +1,68 @@
+# ../udm/spawn_locations/placement.py
+
+"""Provides a queue which places all players spawned in a frame in one pass on the main thread."""
+
+# =============================================================================
+# >> IMPORTS
+# =============================================================================
+# Python Imports
+#   Contextlib
+import contextlib
+
+# Source.Python Imports
+#   Core
+from core import AutoUnload
+#   Listeners
+from listeners import on_tick_listener_manager
+
+# Script Imports
+#   Players
+from udm.players import PlayerEntity
+
+
+# =============================================================================
+# >> SPAWN PLACEMENT QUEUE
+# =============================================================================
+class _SpawnPlacementQueue(list, AutoUnload):
+    """Class used to collect userids of spawned players and move them to spawn locations on the next tick.
+
+    Placements stay mutually exclusive within a batch, because each placed player is written back
+    to the shared player snapshot before the next player of the batch picks their spawn location.
+    """
+
+    def add(self, player):
+        """Queue the player for placement on the next tick."""
+        # Start listening for the next tick, if this is the first player of the batch
+        if not self:
+            on_tick_listener_manager.register_listener(self._on_tick)
+
+        # Queue the player only once per batch
+        if player.userid not in self:
+            self.append(player.userid)
+
+    def _on_tick(self):
+        """Place all queued players in one pass."""
+        on_tick_listener_manager.unregister_listener(self._on_tick)
+
+        # Take the current batch
+        userids = self.copy()
+        self.clear()
+
+        for userid in userids:
+            with contextlib.suppress(ValueError):
+                player = PlayerEntity.cached_from_userid(userid)
+
+                # Only place players who are still alive and on a team
+                if not player.dead and player.team > 1:
+                    player.move_to_random_spawn_location()
+
+    def _unload_instance(self):
+        """Stop listening for ticks on unload."""
+        if self:
+            on_tick_listener_manager.unregister_listener(self._on_tick)
+
+        self.clear()
+
+
+# Store a global instance of `_SpawnPlacementQueue`
+spawn_placement_queue = _SpawnPlacementQueue()
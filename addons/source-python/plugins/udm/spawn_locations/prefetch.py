@@ -0,0 +1,120 @@
+# ../udm/spawn_locations/prefetch.py
+
+"""Provides background prefetching and an LRU cache of spawn location lists."""
+
+# =============================================================================
+# >> IMPORTS
+# =============================================================================
+# Python Imports
+#   Collections
+from collections import OrderedDict
+#   OS
+import os
+#   Threading
+from threading import Lock
+
+# Source.Python Imports
+#   Listeners
+from listeners.tick import GameThread
+
+
+# =============================================================================
+# >> CLASSES
+# =============================================================================
+class SpawnLocationPrefetcher(object):
+    """Class used to build spawn location lists for likely next maps on a worker thread.
+
+        * built lists are kept in an LRU cache of `capacity` maps
+        * cache entries are keyed by JSON file path and validated against the file's mtime
+    """
+
+    def __init__(self, capacity, build):
+        """Object initialization."""
+        # Store the maximum amount of cached maps
+        self._capacity = capacity
+
+        # Store the callable which builds a spawn location list from a JSON file path
+        self._build = build
+
+        # Store the cache as JSON file path => (mtime, spawn location list)
+        self._cache = OrderedDict()
+
+        # Store the JSON file paths which are currently being prefetched
+        self._pending = set()
+
+        # Store a lock for the cache, as it is shared with the worker thread
+        self._lock = Lock()
+
+    def get(self, json_file):
+        """Return a copy of the cached spawn location list for `json_file`, or None if there is no valid entry."""
+        json_file = str(json_file)
+        mtime = self._get_mtime(json_file)
+
+        with self._lock:
+            entry = self._cache.get(json_file)
+
+            # Drop outdated entries
+            if entry is None or entry[0] != mtime:
+                self._cache.pop(json_file, None)
+                return None
+
+            # Mark the entry as recently used
+            self._cache.move_to_end(json_file)
+
+            return list(entry[1])
+
+    def put(self, json_file, spawn_locations, mtime=None):
+        """Store a copy of `spawn_locations` for `json_file` and evict the least recently used entries."""
+        json_file = str(json_file)
+
+        if mtime is None:
+            mtime = self._get_mtime(json_file)
+
+        with self._lock:
+            self._cache[json_file] = (mtime, list(spawn_locations))
+            self._cache.move_to_end(json_file)
+
+            while len(self._cache) > self._capacity:
+                self._cache.popitem(last=False)
+
+    def prefetch(self, json_files):
+        """Build the spawn location lists for `json_files` on a worker thread, if they are not cached yet."""
+        with self._lock:
+            json_files = [
+                str(json_file) for json_file in json_files
+                if str(json_file) not in self._cache and str(json_file) not in self._pending
+            ]
+
+            self._pending.update(json_files)
+
+        if json_files:
+            thread = GameThread(target=self._prefetch, args=(json_files, ))
+            thread.daemon = True
+            thread.start()
+
+    def clear(self):
+        """Clear the cache."""
+        with self._lock:
+            self._cache.clear()
+
+    def _prefetch(self, json_files):
+        """Build and cache the spawn location list for each JSON file."""
+        for json_file in json_files:
+            try:
+                mtime = self._get_mtime(json_file)
+
+                # Skip maps without spawn locations
+                if mtime is not None:
+                    self.put(json_file, self._build(json_file), mtime)
+
+            finally:
+                with self._lock:
+                    self._pending.discard(json_file)
+
+    @staticmethod
+    def _get_mtime(json_file):
+        """Return the mtime of `json_file` or None if it doesn't exist."""
+        try:
+            return os.path.getmtime(json_file)
+        except OSError:
+            return None
@@ -0,0 +1,178 @@
+# ../udm/spawn_locations/recorder.py
+
+"""Provides spawn location generation from sampled player positions."""
+
+# =============================================================================
+# >> IMPORTS
+# =============================================================================
+# Python Imports
+#   Array
+from array import array
+
+# Source.Python Imports
+#   Core
+from core import AutoUnload
+#   Engines
+from engines.server import global_vars
+#   Listeners
+from listeners import OnLevelInit
+from listeners import on_player_run_command_listener_manager
+#   Mathlib
+from mathlib import QAngle
+#   Players
+from players.constants import PlayerStates
+
+# Script Imports
+#   Spawn Locations
+from udm.spawn_locations import SAFE_SPAWN_DISTANCE
+from udm.spawn_locations import spawn_location_manager
+from udm.spawn_locations import SpawnLocation
+from udm.spawn_locations.grid import SpawnLocationGrid
+
+
+# =============================================================================
+# >> CONSTANTS
+# =============================================================================
+# Amount of ticks between two samples of the same player
+SAMPLE_INTERVAL_TICKS = 32
+
+# Maximum amount of samples kept in the ring buffer
+SAMPLE_BUFFER_SIZE = 16384
+
+# Minimum amount of samples in a cell for the cell to produce a spawn location
+MIN_SAMPLES_PER_CELL = 4
+
+
+# =============================================================================
+# >> CLASSES
+# =============================================================================
+class SpawnLocationRecorder(AutoUnload):
+    """Class used to sample player locations into a bounded ring buffer and cluster them into spawn locations.
+
+        * only players standing on the ground are sampled, each one every `SAMPLE_INTERVAL_TICKS` ticks
+        * each sample consists of six floats: x, y, z, pitch, yaw, roll
+        * the run command listener is only registered while recording
+    """
+
+    def __init__(self):
+        """Object initialization."""
+        # Store the ring buffer of samples
+        self._samples = array('f', bytes(4 * 6 * SAMPLE_BUFFER_SIZE))
+
+        # Store the position of the next sample and the amount of samples stored
+        self._head = 0
+        self._count = 0
+
+        # Store whether recording is enabled
+        self._recording = False
+
+    def __len__(self):
+        """Return the amount of samples stored."""
+        return self._count
+
+    def start(self):
+        """Start sampling player locations."""
+        if not self._recording:
+            on_player_run_command_listener_manager.register_listener(self._on_player_run_command)
+            self._recording = True
+
+    def stop(self):
+        """Stop sampling player locations."""
+        if self._recording:
+            on_player_run_command_listener_manager.unregister_listener(self._on_player_run_command)
+            self._recording = False
+
+    def clear(self):
+        """Drop all samples."""
+        self._head = 0
+        self._count = 0
+
+    def generate(self):
+        """Return a list of `SpawnLocation` objects clustered from the samples.
+
+        Samples are bucketed into cells of `SAFE_SPAWN_DISTANCE` units. Starting with the most visited cell,
+        the sample nearest to each cell's mean becomes a candidate, if it is at least `SAFE_SPAWN_DISTANCE` units
+        away from existing spawn locations and all candidates accepted before.
+        """
+        cells = dict()
+
+        # Bucket the samples
+        for sample in range(self._count):
+            values = self._samples[sample * 6:sample * 6 + 6]
+            key = (
+                int(values[0] // SAFE_SPAWN_DISTANCE),
+                int(values[1] // SAFE_SPAWN_DISTANCE),
+                int(values[2] // SAFE_SPAWN_DISTANCE)
+            )
+            cells.setdefault(key, list()).append(tuple(values))
+
+        # Store accepted spawn locations, including the existing ones
+        accepted = SpawnLocationGrid(SAFE_SPAWN_DISTANCE)
+        accepted.rebuild(spawn_location_manager)
+        candidates = list()
+
+        for samples in sorted(cells.values(), key=len, reverse=True):
+            if len(samples) < MIN_SAMPLES_PER_CELL:
+                break
+
+            # Get the sample nearest to the cell's mean
+            mean_x, mean_y, mean_z = (sum(sample[axis] for sample in samples) / len(samples) for axis in range(3))
+            x, y, z, pitch, yaw, roll = min(samples, key=lambda sample: (
+                (sample[0] - mean_x) ** 2 + (sample[1] - mean_y) ** 2 + (sample[2] - mean_z) ** 2
+            ))
+
+            # Skip it if it is too close to another spawn location
+            if next(accepted.near(x, y, z), None) is not None:
+                continue
+
+            accepted.add(x, y, z)
+            candidates.append(SpawnLocation(x, y, z, QAngle(pitch, yaw, roll)))
+
+        return candidates
+
+    def _on_player_run_command(self, player, user_cmd):
+        """Sample the player's location every `SAMPLE_INTERVAL_TICKS` ticks."""
+        # Stagger the players over the sample interval
+        if (global_vars.tick_count + player.index) % SAMPLE_INTERVAL_TICKS:
+            return
+
+        # Only sample alive players standing on the ground
+        if player.dead or not player.flags & PlayerStates.ONGROUND:
+            return
+
+        origin = player.origin
+        view_angles = user_cmd.view_angles
+
+        # Write the sample into the ring buffer
+        position = self._head * 6
+        self._samples[position:position + 6] = array('f', (
+            origin.x, origin.y, origin.z, view_angles.x, view_angles.y, view_angles.z
+        ))
+
+        self._head = (self._head + 1) % SAMPLE_BUFFER_SIZE
+        self._count = min(self._count + 1, SAMPLE_BUFFER_SIZE)
+
+    def _unload_instance(self):
+        """Stop recording on unload."""
+        self.stop()
+
+    @property
+    def recording(self):
+        """Return whether player locations are being sampled."""
+        return self._recording
+
+
+# =============================================================================
+# >> PUBLIC GLOBAL VARIABLES
+# =============================================================================
+# Store a global instance of `SpawnLocationRecorder`
+spawn_location_recorder = SpawnLocationRecorder()
+
+
+# =============================================================================
+# >> LISTENERS
+# =============================================================================
+@OnLevelInit
+def on_level_init(map_name):
+    """Drop the samples of the previous map."""
+    spawn_location_recorder.clear()
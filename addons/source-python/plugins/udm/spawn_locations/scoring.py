@@ -0,0 +1,266 @@
+# ../udm/spawn_locations/scoring.py
+
+"""Provides threat-aware scoring of spawn locations."""
+
+# =============================================================================
+# >> IMPORTS
+# =============================================================================
+# Python Imports
+#   Array
+from array import array
+#   Math
+import math
+#   Time
+import time
+
+# Source.Python Imports
+#   Listeners
+from listeners import OnLevelInit
+
+# Script Imports
+#   Spawn Locations
+from udm.spawn_locations import spawn_location_manager
+from udm.spawn_locations.snapshot import player_snapshot
+
+
+# =============================================================================
+# >> CONSTANTS
+# =============================================================================
+# Distance (in units) beyond which an enemy no longer counts as a threat
+THREAT_DISTANCE_CAP = 2048.0
+
+# Weight of the distance to the enemy team's centroid, relative to the distance to the nearest enemy
+CENTROID_WEIGHT = 0.5
+
+# Score penalty per (decayed) death near a spawn location
+DEATH_PENALTY = 256.0
+
+# Cell size (in units) of the death heatmap
+DEATH_HEATMAP_CELL_SIZE = 256.0
+
+# Time (in seconds) after which a death only counts half
+DEATH_HEATMAP_HALF_LIFE = 10.0
+
+# Amount of heatmap cells after which cold cells are pruned
+DEATH_HEATMAP_PRUNE_SIZE = 1024
+
+
+# =============================================================================
+# >> CLASSES
+# =============================================================================
+class DeathHeatmap(dict):
+    """Class used to store exponentially decaying death counts in cubic cells.
+
+        * cell keys are (x, y, z) tuples of integer cell coordinates
+        * cell values are (heat, time) tuples, `heat` being the death count at `time`
+    """
+
+    def __init__(self, cell_size, half_life):
+        """Object initialization."""
+        # Call dict's constructor
+        super().__init__()
+
+        # Store the cell size
+        self._cell_size = cell_size
+
+        # Store the decay rate per second
+        self._decay_rate = math.log(2) / half_life
+
+    def add(self, x, y, z):
+        """Add a death at the given coordinates."""
+        now = time.time()
+        key = self._cell(x, y, z)
+
+        # Add the death to the decayed heat of the cell
+        self[key] = (self._decayed(key, now) + 1.0, now)
+
+        # Prune cold cells
+        if len(self) > DEATH_HEATMAP_PRUNE_SIZE:
+            for cell in [cell for cell in self if self._decayed(cell, now) < 0.05]:
+                del self[cell]
+
+    def heat(self, x, y, z):
+        """Return the decayed heat of the cell at the given coordinates and its neighbors."""
+        now = time.time()
+        cell_x, cell_y, cell_z = self._cell(x, y, z)
+
+        return sum(
+            self._decayed((cell_x + offset_x, cell_y + offset_y, cell_z + offset_z), now)
+            for offset_x in (-1, 0, 1) for offset_y in (-1, 0, 1) for offset_z in (-1, 0, 1)
+        )
+
+    def _cell(self, x, y, z):
+        """Return the cell key for the given coordinates."""
+        return int(x // self._cell_size), int(y // self._cell_size), int(z // self._cell_size)
+
+    def _decayed(self, key, now):
+        """Return the heat of the cell at `key`, decayed to `now`."""
+        if key not in self:
+            return 0.0
+
+        heat, heat_time = self[key]
+        return heat * math.exp(-self._decay_rate * (now - heat_time))
+
+
+class SpawnScorer(object):
+    """Class used to rank spawn locations by their distance to enemies and recent deaths.
+
+    The distance from each spawn location to the nearest enemy is kept across snapshots:
+
+        * each update compares the snapshot's players with the positions folded in last time
+        * a player who appeared or moved lowers the distances they are now nearest for, O(spawn locations)
+        * a player who left or moved only has the spawn locations they were nearest for recalculated
+        * players who stood still, and enemies beyond `THREAT_DISTANCE_CAP`, cost nothing
+    """
+
+    def __init__(self):
+        """Object initialization."""
+        # Store the spawn index version, snapshot generation and amount of snapshot moves the distances belong to
+        self._version = -1
+        self._generation = -1
+        self._folded = 0
+
+        # Store the folded players as userid => (team, x, y, z)
+        self._players = dict()
+
+        # Store the distances of each spawn location to the nearest enemy as team => array('f')
+        self._nearest_enemy = dict()
+
+        # Store the userid of each spawn location's nearest enemy (0 if none is within the cap) as team => array('i')
+        self._nearest_userid = dict()
+
+        # Store the death heatmap
+        self.heatmap = DeathHeatmap(DEATH_HEATMAP_CELL_SIZE, DEATH_HEATMAP_HALF_LIFE)
+
+    def score(self, index, team):
+        """Return the score of the spawn location at `index` for a player of `team` - the higher, the safer."""
+        self._update()
+
+        x, y, z = spawn_location_manager.coordinates[index]
+
+        # Get the distance to the nearest enemy
+        nearest_enemy = self._nearest_enemy[team][index]
+
+        # Get the distance to the enemy team's centroid
+        centroid = player_snapshot.centroid(5 - team)
+
+        if centroid is None:
+            centroid_distance = THREAT_DISTANCE_CAP
+        else:
+            centroid_distance = min(
+                math.sqrt((centroid[0] - x) ** 2 + (centroid[1] - y) ** 2 + (centroid[2] - z) ** 2),
+                THREAT_DISTANCE_CAP
+            )
+
+        # Return the weighted score, penalized by recent deaths
+        return nearest_enemy + CENTROID_WEIGHT * centroid_distance - DEATH_PENALTY * self.heatmap.heat(x, y, z)
+
+    def _update(self):
+        """Fold in the players who appeared, moved or left since the last update."""
+        # Start over, if the spawn locations have changed
+        if self._version != spawn_location_manager.version:
+            self._version = spawn_location_manager.version
+            self._reset()
+
+        # Nothing to do, if neither a new snapshot has been taken nor a player has been moved in it
+        if self._generation == player_snapshot.generation and self._folded == len(player_snapshot.moves):
+            return
+
+        self._generation = player_snapshot.generation
+        self._folded = len(player_snapshot.moves)
+
+        # Get the players of the snapshot
+        players = {
+            player_snapshot.userids[slot]: (player_snapshot.teams[slot], *player_snapshot.origin(slot))
+            for slot in range(len(player_snapshot)) if player_snapshot.teams[slot] > 1
+        }
+
+        # Remove players who left
+        for userid in self._players.keys() - players.keys():
+            self._remove(userid)
+
+        # Move players who appeared or moved
+        for userid, player in players.items():
+            if self._players.get(userid) == player:
+                continue
+
+            if userid in self._players:
+                self._remove(userid)
+
+            self._add(userid, *player)
+
+    def _reset(self):
+        """Forget all players and reset the distances to `THREAT_DISTANCE_CAP`."""
+        self._players.clear()
+        self._generation = -1
+
+        count = len(spawn_location_manager.coordinates)
+
+        for team in (2, 3):
+            self._nearest_enemy[team] = array('f', [THREAT_DISTANCE_CAP]) * count
+            self._nearest_userid[team] = array('i', [0]) * count
+
+    def _add(self, userid, team, x, y, z):
+        """Add the player, lowering the distances of the spawn locations they are the nearest enemy for."""
+        self._players[userid] = (team, x, y, z)
+
+        for enemy_team, distances in self._nearest_enemy.items():
+            if enemy_team == team:
+                continue
+
+            userids = self._nearest_userid[enemy_team]
+
+            for index, (spawn_x, spawn_y, spawn_z) in enumerate(spawn_location_manager.coordinates):
+                distance = math.sqrt((spawn_x - x) ** 2 + (spawn_y - y) ** 2 + (spawn_z - z) ** 2)
+
+                if distance < distances[index]:
+                    distances[index] = distance
+                    userids[index] = userid
+
+    def _remove(self, userid):
+        """Remove the player, recalculating the distances of the spawn locations they were the nearest enemy for."""
+        team = self._players.pop(userid)[0]
+
+        for enemy_team, distances in self._nearest_enemy.items():
+            if enemy_team == team:
+                continue
+
+            userids = self._nearest_userid[enemy_team]
+
+            # Get the origins of the remaining enemies, once needed
+            enemies = None
+
+            for index, nearest_userid in enumerate(userids):
+                if nearest_userid != userid:
+                    continue
+
+                if enemies is None:
+                    enemies = [
+                        (other_userid, x, y, z) for other_userid, (other_team, x, y, z) in self._players.items()
+                        if other_team != enemy_team
+                    ]
+
+                spawn_x, spawn_y, spawn_z = spawn_location_manager.coordinates[index]
+                distances[index], userids[index] = THREAT_DISTANCE_CAP, 0
+
+                for other_userid, x, y, z in enemies:
+                    distance = math.sqrt((spawn_x - x) ** 2 + (spawn_y - y) ** 2 + (spawn_z - z) ** 2)
+
+                    if distance < distances[index]:
+                        distances[index], userids[index] = distance, other_userid
+
+
+# =============================================================================
+# >> PUBLIC GLOBAL VARIABLES
+# =============================================================================
+# Store a global instance of `SpawnScorer`
+spawn_scorer = SpawnScorer()
+
+
+# =============================================================================
+# >> LISTENERS
+# =============================================================================
+@OnLevelInit
+def on_level_init(map_name):
+    """Clear the death heatmap of the previous map."""
+    spawn_scorer.heatmap.clear()
@@ -0,0 +1,171 @@
+# ../udm/spawn_locations/snapshot.py
+
+"""Provides a per-tick snapshot of alive player origins for spawn location checks."""
+
+# =============================================================================
+# >> IMPORTS
+# =============================================================================
+# Python Imports
+#   Array
+from array import array
+
+# Source.Python Imports
+#   Engines
+from engines.server import global_vars
+#   Filters
+from filters.players import PlayerIter
+
+# Script Imports
+#   Spawn Locations
+from udm.spawn_locations import spawn_location_manager
+
+
+# =============================================================================
+# >> CLASSES
+# =============================================================================
+class PlayerSnapshot(object):
+    """Class used to store alive player origins and teams of the current tick in contiguous buffers.
+
+        * `userids`, `teams` and `origins` share the same player slot order
+        * `origins` stores three floats (x, y, z) per player slot
+        * `occupants` stores the number of players too close to each spawn location
+        * `team_sums` stores the summed origins and the player count of each team
+        * `moves` stores (team, x, y, z) tuples of players moved since the snapshot was taken
+    """
+
+    def __init__(self):
+        """Object initialization."""
+        # Store the tick and spawn index version the snapshot was taken at
+        self._tick = -1
+        self._version = -1
+
+        # Store the snapshot buffers
+        self.userids = array('i')
+        self.teams = array('b')
+        self.origins = array('f')
+        self.occupants = array('H')
+
+        # Store team aggregates and moves since the snapshot was taken
+        self.team_sums = dict()
+        self.moves = list()
+
+        # Store a number which changes whenever a new snapshot has been taken
+        self.generation = 0
+
+        # Store a mapping of userid => player slot
+        self._slots = dict()
+
+    def __len__(self):
+        """Return the amount of players in the snapshot."""
+        return len(self.userids)
+
+    def refresh(self):
+        """Take a new snapshot, if the current one is from an earlier tick or the spawn index has changed."""
+        if self._tick == global_vars.tick_count and self._version == spawn_location_manager.version:
+            return
+
+        self._tick = global_vars.tick_count
+        self._version = spawn_location_manager.version
+
+        # Reset the buffers
+        self.userids = array('i')
+        self.teams = array('b')
+        self.origins = array('f')
+        self.occupants = array('H', bytes(2 * len(spawn_location_manager)))
+        self.team_sums.clear()
+        self.moves.clear()
+        self._slots.clear()
+        self.generation += 1
+
+        # Fill in every alive player
+        for player in PlayerIter('alive'):
+            origin = player.origin
+
+            self._slots[player.userid] = len(self.userids)
+            self.userids.append(player.userid)
+            self.teams.append(player.team)
+            self.origins.extend((origin.x, origin.y, origin.z))
+            self._add_to_team_sum(player.team, origin.x, origin.y, origin.z, 1)
+
+        # Count the players too close to each spawn location in one pass
+        for slot in range(len(self.userids)):
+            for index in spawn_location_manager.near(*self.origin(slot)):
+                self.occupants[index] += 1
+
+    @property
+    def tick(self):
+        """Return the tick the snapshot was taken at."""
+        return self._tick
+
+    def origin(self, slot):
+        """Return the (x, y, z) tuple of the player slot."""
+        return tuple(self.origins[slot * 3:slot * 3 + 3])
+
+    def is_free(self, index, userid):
+        """Return whether no other player than `userid` is too close to the spawn location at `index`."""
+        occupants = self.occupants[index]
+
+        # Don't count the player themselves
+        if occupants and userid in self._slots:
+            if index in spawn_location_manager.near(*self.origin(self._slots[userid])):
+                occupants -= 1
+
+        return occupants == 0
+
+    def has_others(self, userid):
+        """Return whether the snapshot contains any other player than `userid`."""
+        return len(self.userids) > int(userid in self._slots)
+
+    def move(self, userid, team, x, y, z):
+        """Update the origin of `userid`, so later checks in the same tick respect their new location."""
+        slot = self._slots.get(userid)
+
+        # Add the player, if they haven't been alive when the snapshot was taken
+        if slot is None:
+            slot = self._slots[userid] = len(self.userids)
+            self.userids.append(userid)
+            self.teams.append(team)
+            self.origins.extend((x, y, z))
+
+        # Else, remove the player from the occupant counts and their team's sum at their old origin
+        else:
+            for index in spawn_location_manager.near(*self.origin(slot)):
+                self.occupants[index] -= 1
+
+            self._add_to_team_sum(self.teams[slot], *self.origin(slot), -1)
+
+        # Store the new origin
+        self.origins[slot * 3:slot * 3 + 3] = array('f', (x, y, z))
+
+        # Add the player to the occupant counts and their team's sum at their new origin
+        for index in spawn_location_manager.near(x, y, z):
+            self.occupants[index] += 1
+
+        self._add_to_team_sum(self.teams[slot], x, y, z, 1)
+
+        # Remember the move
+        self.moves.append((self.teams[slot], x, y, z))
+
+    def centroid(self, team):
+        """Return the (x, y, z) tuple of the team's average origin, or None if the team has no players."""
+        team_sum = self.team_sums.get(team)
+
+        if team_sum is None or team_sum[3] <= 0:
+            return None
+
+        return team_sum[0] / team_sum[3], team_sum[1] / team_sum[3], team_sum[2] / team_sum[3]
+
+    def _add_to_team_sum(self, team, x, y, z, count):
+        """Add the origin to (`count` = 1) or remove it from (`count` = -1) the team's sum."""
+        team_sum = self.team_sums.setdefault(team, [0.0, 0.0, 0.0, 0])
+        team_sum[0] += x * count
+        team_sum[1] += y * count
+        team_sum[2] += z * count
+        team_sum[3] += count
+
+
+# =============================================================================
+# >> PUBLIC GLOBAL VARIABLES
+# =============================================================================
+# Store a global instance of `PlayerSnapshot`
+player_snapshot = PlayerSnapshot()
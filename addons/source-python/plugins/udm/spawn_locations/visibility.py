@@ -0,0 +1,336 @@
+# ../udm/spawn_locations/visibility.py
+
+"""Provides a cached spawn-to-spawn visibility matrix, built incrementally during quiet ticks."""
+
+# =============================================================================
+# >> IMPORTS
+# =============================================================================
+# Python Imports
+#   Contextlib
+import contextlib
+#   Hashlib
+import hashlib
+#   OS
+import os
+#   Struct
+import struct
+
+# Source.Python Imports
+#   Core
+from core import AutoUnload
+#   Engines
+from engines.server import global_vars
+from engines.trace import ContentMasks
+from engines.trace import engine_trace
+from engines.trace import GameTrace
+from engines.trace import Ray
+from engines.trace import TraceFilterSimple
+from engines.trace import TraceType
+#   Listeners
+from listeners import OnLevelInit
+from listeners import on_tick_listener_manager
+#   Mathlib
+from mathlib import Vector
+
+# Script Imports
+#   Config
+from udm.config import cvar_spawn_visibility_traces_per_tick
+#   Spawn Locations
+from udm.spawn_locations import spawn_location_manager
+from udm.spawn_locations.snapshot import player_snapshot
+
+
+# =============================================================================
+# >> CONSTANTS
+# =============================================================================
+# Eye height (in units) above a spawn location used for traces
+EYE_HEIGHT = 64.0
+
+# Maximum distance (in units) of a player to a spawn location for the player to count as standing in its area
+AREA_RADIUS = 512.0
+
+# Trace filter which only hits static map geometry, so players, doors and props never end up in the matrix
+WORLD_ONLY_TRACE_FILTER = TraceFilterSimple(trace_type=TraceType.WORLD_ONLY)
+
+
+# =============================================================================
+# >> TRACE BACKENDS
+# =============================================================================
+def engine_trace_visible(start, end):
+    """Return whether `end` can be seen from `start` - both being (x, y, z) tuples - using an engine trace."""
+    trace = GameTrace()
+
+    engine_trace.trace_ray(
+        Ray(Vector(*start), Vector(*end)), ContentMasks.VISIBLE, WORLD_ONLY_TRACE_FILTER, trace
+    )
+
+    return not trace.did_hit()
+
+
+# =============================================================================
+# >> CLASSES
+# =============================================================================
+class VisibilityMatrix(object):
+    """Class used to store which spawn locations can see each other as a symmetric bit matrix.
+
+        * pairs which have not been traced yet count as not visible
+        * `trace_function(start, end)` is swappable, so the builder can run against a fake trace function
+    """
+
+    # Store the file format identification
+    magic = b'UDMV'
+    version = 2
+
+    # Store the binary layout of the file header
+    header = struct.Struct('<4sHI20s')
+
+    def __init__(self, trace_function=engine_trace_visible):
+        """Object initialization."""
+        # Store the trace function
+        self.trace_function = trace_function
+
+        # Store the eye positions of the spawn locations
+        self._eyes = list()
+
+        # Store the visibility bits (row-major, one row per spawn location)
+        self._bits = bytearray()
+
+        # Store the next pair (i, j) with i < j to trace
+        self._cursor = (0, 1)
+
+        # Store the hash of the spawn locations the matrix belongs to
+        self._digest = b''
+
+    def __len__(self):
+        """Return the amount of spawn locations in the matrix."""
+        return len(self._eyes)
+
+    def rebuild(self, coordinates):
+        """Reset the matrix for `coordinates` - a list of (x, y, z) tuples."""
+        self._eyes = [(x, y, z + EYE_HEIGHT) for x, y, z in coordinates]
+        self._bits = bytearray((len(self._eyes) ** 2 + 7) // 8)
+        self._cursor = (0, 1)
+        self._digest = hashlib.sha1(
+            b''.join(struct.pack('<3f', *location) for location in coordinates)
+        ).digest()
+
+    def step(self, budget):
+        """Trace up to `budget` pairs and return whether the matrix is complete."""
+        count = len(self._eyes)
+        i, j = self._cursor
+
+        while budget > 0 and i < count - 1:
+            if self.trace_function(self._eyes[i], self._eyes[j]):
+                self._set(i, j)
+                self._set(j, i)
+
+            budget -= 1
+
+            # Advance to the next pair
+            j += 1
+
+            if j == count:
+                i += 1
+                j = i + 1
+
+        self._cursor = (i, j)
+
+        return self.complete
+
+    def visible(self, i, j):
+        """Return whether the spawn locations at `i` and `j` can see each other."""
+        bit = i * len(self._eyes) + j
+        return bool(self._bits[bit >> 3] & (1 << (bit & 7)))
+
+    def row(self, i):
+        """Return a bytearray with a 1 for each spawn location visible from the spawn location at `i`."""
+        return bytearray(self.visible(i, j) for j in range(len(self._eyes)))
+
+    def load(self, path):
+        """Load the bits from `path`, if the file belongs to the current spawn locations."""
+        with contextlib.suppress(OSError, struct.error), open(path, 'rb') as f:
+            magic, version, count, digest = self.header.unpack(f.read(self.header.size))
+
+            if (magic, version, count, digest) != (self.magic, self.version, len(self._eyes), self._digest):
+                return False
+
+            bits = f.read()
+
+            if len(bits) != len(self._bits):
+                return False
+
+            # Mark the matrix as complete
+            self._bits = bytearray(bits)
+            self._cursor = (max(len(self._eyes) - 1, 0), len(self._eyes))
+
+            return True
+
+        return False
+
+    def save(self, path):
+        """Save the bits to `path`."""
+        temporary_path = f'{path}.tmp'
+
+        with contextlib.suppress(OSError):
+            with open(temporary_path, 'wb') as f:
+                f.write(self.header.pack(self.magic, self.version, len(self._eyes), self._digest))
+                f.write(self._bits)
+
+            # Replace the file in one step
+            os.replace(temporary_path, path)
+
+    def _set(self, i, j):
+        """Mark the spawn location at `j` as visible from the spawn location at `i`."""
+        bit = i * len(self._eyes) + j
+        self._bits[bit >> 3] |= 1 << (bit & 7)
+
+    @property
+    def complete(self):
+        """Return whether all pairs have been traced."""
+        return self._cursor[0] >= len(self._eyes) - 1
+
+
+class _SpawnVisibility(AutoUnload):
+    """Class used to build the visibility matrix for the current map during quiet ticks and answer lookups.
+
+    Each player is assigned to the area of their nearest spawn location (within `AREA_RADIUS`),
+    so whether an enemy can see a spawn location is a lookup in the row of the enemy's area.
+    """
+
+    def __init__(self, trace_function=engine_trace_visible):
+        """Object initialization."""
+        # Store the visibility matrix
+        self.matrix = VisibilityMatrix(trace_function)
+
+        # Store the spawn index version the matrix belongs to
+        self._version = -1
+
+        # Store whether the tick listener is registered
+        self._building = False
+
+        # Store the snapshot generation and moves the exposed spawn locations belong to
+        self._generation = -1
+        self._folded = 0
+
+        # Store spawn locations exposed to the enemies of each team as team => bytearray
+        self._exposed = dict()
+
+    def update(self):
+        """Reset the matrix and start building it, if the spawn locations have changed."""
+        if self._version == spawn_location_manager.version:
+            return
+
+        self._version = spawn_location_manager.version
+        self._generation = -1
+
+        # Reset the matrix for the current spawn locations
+        self.matrix.rebuild(spawn_location_manager.coordinates)
+
+        # Load it from disk, or build it during the next ticks
+        if not self.matrix.load(self.path) and not self._building:
+            on_tick_listener_manager.register_listener(self._on_tick)
+            self._building = True
+
+    def is_exposed(self, index, team):
+        """Return whether the spawn location at `index` can be seen by an enemy of `team`."""
+        self.update()
+
+        # Drop the exposed spawn locations of an earlier snapshot
+        if self._generation != player_snapshot.generation:
+            self._generation = player_snapshot.generation
+            self._exposed.clear()
+            self._folded = 0
+
+        # Fold in players moved since the last lookup
+        moves = player_snapshot.moves[self._folded:]
+
+        for moved_team, x, y, z in moves:
+            for exposed_team, exposed in self._exposed.items():
+                if exposed_team != moved_team:
+                    self._expose(exposed, x, y, z)
+
+        self._folded += len(moves)
+
+        # Calculate the exposed spawn locations for the team, if not done yet
+        if team not in self._exposed:
+            exposed = self._exposed[team] = bytearray(len(self.matrix))
+
+            for slot in range(len(player_snapshot)):
+                if player_snapshot.teams[slot] > 1 and player_snapshot.teams[slot] != team:
+                    self._expose(exposed, *player_snapshot.origin(slot))
+
+        return self._exposed[team][index] == 1
+
+    def _expose(self, exposed, x, y, z):
+        """Mark all spawn locations visible from the area at the given coordinates as exposed."""
+        area = self._get_area(x, y, z)
+
+        if area is None:
+            return
+
+        # The spawn location of the area itself is in plain view
+        exposed[area] = 1
+
+        for index, visible in enumerate(self.matrix.row(area)):
+            if visible:
+                exposed[index] = 1
+
+    def _get_area(self, x, y, z):
+        """Return the index of the nearest spawn location within `AREA_RADIUS`, or None."""
+        best = None
+        best_distance = AREA_RADIUS ** 2
+
+        for index, (spawn_x, spawn_y, spawn_z) in enumerate(spawn_location_manager.coordinates):
+            distance = (spawn_x - x) ** 2 + (spawn_y - y) ** 2 + (spawn_z - z) ** 2
+
+            if distance < best_distance:
+                best, best_distance = index, distance
+
+        return best
+
+    def _on_tick(self):
+        """Trace a budgeted amount of pairs, if no player has been placed in this tick."""
+        # Wait for quiet ticks
+        if player_snapshot.tick == global_vars.tick_count:
+            return
+
+        budget = cvar_spawn_visibility_traces_per_tick.get_int()
+
+        if budget <= 0:
+            return
+
+        # Save the matrix and stop building, once it is complete
+        if self.matrix.step(budget):
+            self.matrix.save(self.path)
+            self._stop_building()
+
+    def _stop_building(self):
+        """Unregister the tick listener."""
+        if self._building:
+            on_tick_listener_manager.unregister_listener(self._on_tick)
+            self._building = False
+
+    def _unload_instance(self):
+        """Unregister the tick listener on unload."""
+        self._stop_building()
+
+    @property
+    def path(self):
+        """Return the path to the visibility file for the current map."""
+        return os.path.splitext(str(spawn_location_manager.json_file))[0] + '.vis'
+
+
+# =============================================================================
+# >> PUBLIC GLOBAL VARIABLES
+# =============================================================================
+# Store a global instance of `_SpawnVisibility`
+spawn_visibility = _SpawnVisibility()
+
+
+# =============================================================================
+# >> LISTENERS
+# =============================================================================
+@OnLevelInit
+def on_level_init(map_name):
+    """Start building or load the visibility matrix for the new map."""
+    spawn_visibility.update()
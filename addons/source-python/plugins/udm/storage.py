@@ -0,0 +1,257 @@
+# ../udm/storage.py
+
+"""Provides persistent inventory storage backed by SQLite."""
+
+# =============================================================================
+# >> IMPORTS
+# =============================================================================
+# Python Imports
+#   JSON
+import json
+#   SQLite3
+import sqlite3
+#   Threading
+from threading import Event
+from threading import Lock
+#   Time
+import time
+
+# Source.Python Imports
+#   Core
+from core import AutoUnload
+#   Hooks
+from hooks.exceptions import except_hooks
+#   Listeners
+from listeners.tick import GameThread
+#   Paths
+from paths import PLUGIN_DATA_PATH
+
+# Script Imports
+#   Info
+from udm.info import info
+#   Weapons
+from udm.weapons import weapon_manager
+
+
+# =============================================================================
+# >> CONSTANTS
+# =============================================================================
+# Time (in seconds) between two batched writes
+WRITE_INTERVAL = 5.0
+
+# Time (in milliseconds) the writer thread waits for a database lock held by another server process
+BUSY_TIMEOUT = 5000
+
+# Time (in milliseconds) reads on the game thread wait for a database lock, so they never stall a tick
+READ_TIMEOUT = 50
+
+# Time (in seconds) reads are skipped after a failed read
+READ_RETRY_INTERVAL = 1.0
+
+# Prefix of the uniqueids of bots, whose records are never persisted
+BOT_UNIQUEID_PREFIX = 'BOT'
+
+
+# =============================================================================
+# >> CLASSES
+# =============================================================================
+class _InventoryStorage(AutoUnload):
+    """Class used to persist the inventories and inventory selections of players by uniqueid.
+
+        * `save()` only serializes the record on the game thread and queues it
+        * a writer thread writes all queued records in one transaction every `WRITE_INTERVAL` seconds
+        * `load()` reads a single row, so records are only loaded on first access after connecting
+        * the writer thread creates the table, reads are skipped until it exists (and shortly after a failed read)
+        * `load()` returns whether the row could be read, so callers can retry and hold back saves until then
+        * the database uses WAL mode, so several server processes on the same machine can share it
+    """
+
+    # Store the path to the database file
+    path = PLUGIN_DATA_PATH.joinpath(info.name, 'inventories.sqlite')
+
+    def __init__(self):
+        """Object initialization."""
+        # Store the serialized records waiting to be written as uniqueid => (selection, inventories JSON)
+        self._pending = dict()
+
+        # Store the serialized records currently being written
+        self._writing = dict()
+
+        # Store a lock for the pending records, as they are shared with the writer thread
+        self._lock = Lock()
+
+        # Store the connection used for reads on the game thread
+        self._connection = None
+
+        # Store the time before which reads are skipped
+        self._retry_time = 0.0
+
+        # Store the events which are set once the table exists and to stop the writer thread
+        self._ready = Event()
+        self._stop = Event()
+
+        # Start the writer thread
+        self._writer = GameThread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def load(self, uniqueid, record):
+        """Fill `record` with the stored inventories and inventory selection for `uniqueid`.
+
+        Inventory items (and the inventory selection, if `record` holds any inventory item) already in `record`
+        are kept. Return whether the stored inventories could be read - False if `record` has not been filled.
+        """
+        with self._lock:
+            row = self._pending.get(uniqueid, self._writing.get(uniqueid))
+
+        # Read the row, if there are no newer records waiting to be written
+        if row is None:
+
+            # Skip reading until the writer thread has created the table, or shortly after a failed read
+            if not self._ready.is_set() or time.time() < self._retry_time:
+                return False
+
+            try:
+                row = self._get_connection().execute(
+                    'SELECT selection, inventories FROM inventories WHERE uniqueid = ?', (uniqueid, )
+                ).fetchone()
+            except sqlite3.Error:
+                except_hooks.print_exception()
+                self._retry_time = time.time() + READ_RETRY_INTERVAL
+                return False
+
+            if row is None:
+                return True
+
+        selection, inventories = row
+
+        # Keep the inventory selection of a player who has chosen weapons already
+        if record.inventories.empty:
+            record.selection = selection
+
+        # Restore the inventory items of weapons which are still available
+        for inventory_index, items in json.loads(inventories).items():
+            for tag, (basename, silencer_option) in items.items():
+                weapon_data = weapon_manager.get(basename)
+
+                if weapon_data is None or weapon_data.tag != tag:
+                    continue
+
+                inventory = record.inventories[int(inventory_index)]
+
+                if tag in inventory:
+                    continue
+
+                inventory.add_inventory_item(weapon_data)
+                inventory[tag].silencer_option = silencer_option
+
+        return True
+
+    def save(self, uniqueid, record):
+        """Queue the inventories and inventory selection of `record` to be written for `uniqueid`."""
+        inventories = json.dumps({
+            inventory_index: {
+                tag: (inventory_item.data.basename, inventory_item.silencer_option)
+                for tag, inventory_item in inventory.items() if inventory_item.data is not None
+            }
+            for inventory_index, inventory in record.inventories.items()
+        })
+
+        with self._lock:
+            self._pending[uniqueid] = (record.selection, inventories)
+
+    def _get_connection(self):
+        """Return the connection used for reads on the game thread."""
+        if self._connection is None:
+            self._connection = sqlite3.connect(str(self.path), timeout=READ_TIMEOUT / 1000)
+
+        return self._connection
+
+    @staticmethod
+    def _create_table(connection):
+        """Switch the database to WAL mode and create the table if it does not exist (on the writer thread).
+
+        Return whether the table exists.
+        """
+        try:
+            connection.execute('PRAGMA journal_mode = WAL')
+            connection.execute('PRAGMA synchronous = NORMAL')
+
+            with connection:
+                connection.execute(
+                    'CREATE TABLE IF NOT EXISTS inventories ('
+                    'uniqueid TEXT PRIMARY KEY, selection INTEGER NOT NULL, '
+                    'inventories TEXT NOT NULL, updated REAL NOT NULL)'
+                )
+
+        except sqlite3.Error:
+            except_hooks.print_exception()
+            return False
+
+        return True
+
+    def _write_loop(self):
+        """Write the pending records every `WRITE_INTERVAL` seconds until stopped (on the writer thread)."""
+        connection = sqlite3.connect(str(self.path), timeout=BUSY_TIMEOUT / 1000)
+
+        try:
+            # Create the table, retrying while another server process holds the lock
+            while not self._create_table(connection):
+                if self._stop.wait(WRITE_INTERVAL):
+                    return
+
+            self._ready.set()
+
+            while not self._stop.wait(WRITE_INTERVAL):
+                self._flush(connection)
+
+            # Write what's left on stop
+            self._flush(connection)
+
+        finally:
+            connection.close()
+
+    def _flush(self, connection):
+        """Write all pending records in one transaction (on the writer thread)."""
+        with self._lock:
+            pending, self._pending = self._pending, dict()
+            self._writing = pending
+
+        if not pending:
+            return
+
+        now = time.time()
+
+        try:
+            with connection:
+                connection.executemany(
+                    'INSERT OR REPLACE INTO inventories (uniqueid, selection, inventories, updated) VALUES (?, ?, ?, ?)',
+                    [(uniqueid, selection, inventories, now) for uniqueid, (selection, inventories) in pending.items()]
+                )
+
+        except sqlite3.Error:
+            except_hooks.print_exception()
+
+            # Keep the records which couldn't be written, unless they have been queued again since
+            with self._lock:
+                for uniqueid, row in pending.items():
+                    self._pending.setdefault(uniqueid, row)
+
+        finally:
+            with self._lock:
+                self._writing = dict()
+
+    def _unload_instance(self):
+        """Write all pending records and close the connections on unload."""
+        self._stop.set()
+        self._writer.join()
+
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+# =============================================================================
+# >> PUBLIC GLOBAL VARIABLES
+# =============================================================================
+# Store a global instance of `_InventoryStorage`
+inventory_storage = _InventoryStorage()
@@ -13,12 +13,16 @@ import random
 #   Commands
 from commands.client import ClientCommandFilter
 from commands.typed import TypedSayCommand
+from commands.typed import TypedServerCommand
 #   Core
+from core import echo_console
 from core import GAME_NAME
 from core import OutputReturn
 #   Entities
 from entities.entity import Entity
+from entities.helpers import index_from_pointer
 from entities.hooks import EntityCondition
+from entities.hooks import EntityPostHook
 from entities.hooks import EntityPreHook
 #   Events
 from events import Event
@@ -32,7 +36,6 @@ from listeners import OnLevelEnd
 from listeners import OnPlayerRunCommand
 from listeners import OnServerActivate
 from listeners import OnServerOutput
-from listeners.tick import GameThread
 #   Memory
 from memory import make_object
 #   Messages
@@ -45,6 +48,8 @@ from weapons.entity import Weapon
 # Script Imports
 #   Admin
 from udm.admin import admin_menu
+#   Benchmarks
+from udm.benchmarks import benchmarks
 #   Config
 from udm.config import cvar_enable_infinite_ammo
 from udm.config import cvar_enable_noblock
@@ -68,12 +73,19 @@ from udm.entities import EntityRemover
 from udm.info import info
 #   Menus
 from udm.weapons.menus import primary_menu
+from udm.weapons.menus import rebuild_menus
 #   Players
 from udm.players import PlayerEntity
 #   Spawn Locations
 from udm.spawn_locations import menus
+from udm.spawn_locations.placement import spawn_placement_queue
+from udm.spawn_locations.scoring import spawn_scorer
 #   Weapons
+from udm.weapons import silencer_classnames
 from udm.weapons import weapon_manager
+from udm.weapons.collector import ground_weapon_collector
+from udm.weapons.collisions import classname_collisions
+from udm.weapons.deck import random_weapon_decks
 
 
 # =============================================================================
@@ -95,14 +107,25 @@ map_functions = [
 ]
 
 
+# =============================================================================
+# >> SECONDARY ATTACK STATES
+# =============================================================================
+# Store the secondary attack states
+ATTACK2_RELEASED = 0
+ATTACK2_HELD = 1
+ATTACK2_HELD_SILENCER = 2
+
+# Store the secondary attack state of the previous user command by player index (64 players + SourceTV)
+attack2_states = bytearray(66)
+
+
 # =============================================================================
 # >> HELPER FUNCTIONS
 # =============================================================================
 def prepare_player(player):
     """Prepare the player for battle."""
-    # Perform setting the player's spawn location on another thread
-    move_player_thread = GameThread(target=player.move_to_random_spawn_location)
-    move_player_thread.start()
+    # Move the player to a spawn location on the next tick, together with all other players spawned in this frame
+    spawn_placement_queue.add(player)
 
     # Give armor
     player.give_named_item('item_assaultsuit')
@@ -149,7 +172,7 @@ def on_pre_round_freeze_end(game_event):
 @Event('player_spawn')
 def on_player_spawn(game_event):
     """Prepare the player for battle if they are alive and on a team."""
-    player = PlayerEntity.from_userid(game_event['userid'])
+    player = PlayerEntity.cached_from_userid(game_event['userid'])
 
     if not player.dead and player.team > 1:
         prepare_player(player)
@@ -163,7 +186,7 @@ def on_player_death(game_event):
 
     # Handle attacker rewards, if the attacker's userid is valid
     if userid_attacker:
-        attacker = PlayerEntity.from_userid(userid_attacker)
+        attacker = PlayerEntity.cached_from_userid(userid_attacker)
 
         # Handle headshot reward
         if cvar_refill_clip_on_headshot.get_int() > 0 and game_event['headshot']:
@@ -171,11 +194,14 @@ def on_player_death(game_event):
             # Get the weapon's data
             weapon_data = weapon_manager.by_name(attacker.active_weapon.weapon_name)
 
-            # Refill the weapon's clip
-            attacker.refill_clip(weapon_data)
+            # Refill only valid weapons
+            if weapon_data is not None:
+
+                # Refill the weapon's clip
+                attacker.refill_clip(weapon_data)
 
-            # Restore the weapon's ammo
-            attacker.active_weapon.ammo = weapon_data.maxammo
+                # Restore the weapon's ammo
+                attacker.active_weapon.ammo = weapon_data.maxammo
 
         # Give a High Explosive grenade, if it was a HE grenade kill
         if cvar_equip_hegrenade.get_int() == 2 and game_event['weapon'] == 'hegrenade':
@@ -186,37 +212,51 @@ def on_player_death(game_event):
             attacker.health = 100
 
     # Get a PlayerEntity instance for the victim
-    victim = PlayerEntity.from_userid(game_event['userid'])
+    victim = PlayerEntity.cached_from_userid(game_event['userid'])
+
+    # Add the victim's location to the death heatmap
+    spawn_scorer.heatmap.add(victim.origin.x, victim.origin.y, victim.origin.z)
 
     # Respawn the victim after the configured respawn delay
     delay_manager(
-        f'respawn_{victim.userid}', abs(cvar_respawn_delay.get_float()), PlayerEntity.respawn, (victim.index, )
+        ('respawn', victim.index), abs(cvar_respawn_delay.get_float()), PlayerEntity.respawn, (victim.index, )
     )
 
 
+@Event('player_activate')
+def on_player_activate(game_event):
+    """Cache a PlayerEntity instance for the player."""
+    PlayerEntity.cached_from_userid(game_event['userid'])
+
+
 @Event('player_disconnect')
 def on_player_disconnect(game_event):
-    """Cancel all pending delays for the disconnecting player."""
-    player = PlayerEntity.from_userid(game_event['userid'])
+    """Cancel all pending delays for the disconnecting player and park their record."""
+    player = PlayerEntity.cached_from_userid(game_event['userid'])
+
+    delay_manager.cancel_owner(player.index)
 
-    delay_manager.cancel(f'respawn_{player.userid}')
-    delay_manager.cancel(f'protect_{player.userid}')
+    PlayerEntity.forget(player.index)
 
-    player.clear_data(keep_inventories=True)
+    # Reset the player's secondary attack state
+    attack2_states[player.index] = ATTACK2_RELEASED
+
+    # Park the player's record until they reconnect
+    PlayerEntity.park_record(player.uniqueid)
 
 
 @Event('round_end')
 def on_round_end(game_event):
     """Cancel all pending delays and team change counts."""
     delay_manager.clear()
-    PlayerEntity.team_changes_store.clear()
+    PlayerEntity.reset_all_team_changes()
 
 
 @Event('hegrenade_detonate')
 def on_hegrenade_detonate(game_event):
     """Equip the player with another High Explosive grenade if configured that way."""
     if cvar_equip_hegrenade.get_int() == 3:
-        player = PlayerEntity.from_userid(game_event['userid'])
+        player = PlayerEntity.cached_from_userid(game_event['userid'])
         player.give_weapon('weapon_hegrenade')
 
 
@@ -224,7 +264,7 @@ def on_hegrenade_detonate(game_event):
 def on_weapon_reload(game_event):
     """Refill the player's ammo."""
     if cvar_enable_infinite_ammo.get_int() > 0:
-        player = PlayerEntity.from_userid(game_event['userid'])
+        player = PlayerEntity.cached_from_userid(game_event['userid'])
         player.refill_ammo()
 
 
@@ -232,7 +272,7 @@ def on_weapon_reload(game_event):
 def on_weapon_fire_on_empty(game_event):
     """Refill the player's ammo, if the player's active weapon's clip is about to be empty."""
     if cvar_enable_infinite_ammo.get_int() > 0:
-        player = PlayerEntity.from_userid(game_event['userid'])
+        player = PlayerEntity.cached_from_userid(game_event['userid'])
 
         # Refill only valid weapons
         if weapon_manager.by_name(player.active_weapon.weapon_name) is not None:
@@ -250,7 +290,7 @@ def on_weapon_fire_on_empty(game_event):
 def on_pre_bump_weapon(stack_data):
     """Block bumping into the weapon if it's not in the player's inventory."""
     # Get a PlayerEntity instance for the player
-    player = make_object(PlayerEntity, stack_data[0])
+    player = PlayerEntity.cached(index_from_pointer(stack_data[0]))
 
     # Block the weapon bump if the player is using the admin menu
     if admin_menu.is_used_by(player.userid):
@@ -276,7 +316,7 @@ def on_pre_bump_weapon(stack_data):
 
             inventory_item = player.inventory[weapon_data.tag]
 
-            if inventory_item.data.name not in (weapon.weapon_name, weapon.classname):
+            if inventory_item.weapon_id != weapon_data.id and inventory_item.data.name != weapon.classname:
                 return False
 
         # Handle silencing
@@ -292,10 +332,18 @@ def on_pre_bump_weapon(stack_data):
                 weapon_manager.set_silencer(weapon, inventory_item.silencer_option)
 
 
+@EntityPostHook(EntityCondition.is_human_player, 'bump_weapon')
+@EntityPostHook(EntityCondition.is_bot_player, 'bump_weapon')
+def on_post_bump_weapon(stack_data, return_value):
+    """Stop collecting the weapon, if the player picked it up."""
+    if return_value:
+        ground_weapon_collector.discard(make_object(Weapon, stack_data[1]))
+
+
 @EntityPreHook(EntityCondition.is_human_player, 'drop_weapon')
 @EntityPreHook(EntityCondition.is_bot_player, 'drop_weapon')
 def on_pre_drop_weapon(stack_data):
-    """Remove the dropped weapon after one second."""
+    """Queue the dropped weapon for removal by the ground weapon collector."""
     # Get the weapon dropped
     weapon_ptr = stack_data[1]
 
@@ -305,10 +353,8 @@ def on_pre_drop_weapon(stack_data):
         # Get a Weapon instance for the dropped weapon
         weapon = make_object(Weapon, weapon_ptr)
 
-        # Remove it after one second
-        delay_manager(
-            f'drop_{weapon.index}', 1, weapon_manager.remove_weapon, (weapon.index, )
-        )
+        # Remove it with the next sweep after one second
+        ground_weapon_collector.add(weapon)
 
 
 # =============================================================================
@@ -316,10 +362,9 @@ def on_pre_drop_weapon(stack_data):
 # =============================================================================
 @OnEntityDeleted
 def on_entity_deleted(base_entity):
-    """Cancel the refill & drop delays for the deleted entity."""
+    """Cancel all pending delays (e.g. refill) for the deleted weapon."""
     if base_entity.classname.startswith(weapon_manager.prefix):
-        delay_manager.cancel(f'drop_{base_entity.index}')
-        delay_manager.cancel(f'refill_clip_{base_entity.index}')
+        delay_manager.cancel_owner(base_entity.index)
 
 
 @OnEntitySpawned
@@ -342,22 +387,41 @@ def on_level_end():
     # Cancel all delays
     delay_manager.clear()
 
+    # Reset all secondary attack states
+    attack2_states[:] = bytes(len(attack2_states))
+
 
 @OnPlayerRunCommand
 def on_player_run_command(player, user_cmd):
-    """Store the silencer option when the player attaches or detaches the silencer."""
-    # Ignore dead players
-    if player.dead:
-        return
-
-    # Ignore bots
-    if player.is_bot():
-        return
+    """Store the silencer option when the player attaches or detaches the silencer.
 
+    Weapons are only looked at while secondary attack is held, if it has been pressed with a weapon
+    which can be silenced. For all other players this is a single bitmask test.
+    """
     # Only respect secondary attack
     if not user_cmd.buttons & PlayerButtons.ATTACK2:
+
+        # Take note of the release
+        if attack2_states[player.index]:
+            attack2_states[player.index] = ATTACK2_RELEASED
+
+        return
+
+    # Get the state of the previous user command
+    state = attack2_states[player.index]
+
+    # Ignore secondary attack being held, if it hasn't been pressed with a weapon which can be silenced
+    if state == ATTACK2_HELD:
         return
 
+    # Take note of the press
+    if state == ATTACK2_RELEASED:
+        attack2_states[player.index] = ATTACK2_HELD
+
+        # Ignore dead players and bots
+        if player.dead or player.is_bot():
+            return
+
     # Get the player's active weapon
     weapon = player.active_weapon
 
@@ -366,20 +430,25 @@ def on_player_run_command(player, user_cmd):
         return
 
     # Only respect weapons with silencers
-    if weapon.classname not in (
-        'weapon_m4a1',
-        'weapon_hkp2000' if GAME_NAME == 'csgo' else 'weapon_usp'
-    ):
+    if weapon.classname not in silencer_classnames:
         return
 
-    # Set the silencer option for the player's inventory item
-    inventory_item = PlayerEntity(player.index).inventory_item_by_weapon_name(weapon.weapon_name)
+    attack2_states[player.index] = ATTACK2_HELD_SILENCER
+
+    # Get the player's inventory item for the weapon
+    player = PlayerEntity.cached(player.index)
+    inventory_item = player.inventory_item_by_weapon_name(weapon.weapon_name)
 
     if inventory_item is not None:
-        inventory_item.silencer_option = weapon.get_property_bool('m_bSilencerOn')
+        silencer_option = weapon.get_property_bool('m_bSilencerOn')
 
         if GAME_NAME == 'csgo':
-            inventory_item.silencer_option = not inventory_item.silencer_option
+            silencer_option = not silencer_option
+
+        # Set and persist the silencer option, if it has changed
+        if inventory_item.silencer_option != silencer_option:
+            inventory_item.silencer_option = silencer_option
+            player.save_record()
 
 
 @OnServerActivate
@@ -407,7 +476,7 @@ def on_server_output(severity, msg):
 def client_command_filter(command, index):
     """Handle buy anywhere & spawning in the middle of the round."""
     # Get a PlayerEntity instance for the player
-    player = PlayerEntity(index)
+    player = PlayerEntity.cached(index)
 
     # Get the client command
     client_command = command[0]
@@ -455,7 +524,7 @@ def client_command_filter(command, index):
 def on_saycommand_guns(command_info, *args):
     """Allow the player to edit & equip one of their inventories."""
     # Get a PlayerEntity instance for the player who entered the chat command
-    player = PlayerEntity(command_info.index)
+    player = PlayerEntity.cached(command_info.index)
 
     # Get the selection for the inventory the player wants to equip or edit
     selection = args[0] if args else None
@@ -505,7 +574,7 @@ def on_saycommand_guns(command_info, *args):
 def on_saycommand_admin(command_info):
     """Send the Admin menu to the player."""
     # Get a PlayerEntity instance for the player
-    player = PlayerEntity(command_info.index)
+    player = PlayerEntity.cached(command_info.index)
 
     # Protect the player indefinitely
     player.enable_damage_protection()
@@ -521,6 +590,100 @@ def on_saycommand_admin(command_info):
     return False
 
 
+# =============================================================================
+# >> SERVER COMMANDS
+# =============================================================================
+@TypedServerCommand('udm_delay_stats')
+def on_servercommand_delay_stats(command_info, action=None):
+    """Print pending delays, lateness and callback cost percentiles per delay namespace, or reset them."""
+    if action == 'reset':
+        delay_manager.reset_stats()
+
+        # Tell the server
+        echo_console('[UDM] Delay stats reset.')
+        return
+
+    # Print a header
+    echo_console(
+        f'{"Namespace":<24}{"Pending":>8}{"Peak":>8}{"Calls":>10}'
+        f'{"Late p50":>10}{"p99":>8}{"Cost p50":>10}{"p99":>8}'
+    )
+
+    # Print a line for each namespace (lateness and cost in milliseconds)
+    for namespace, stats in sorted(delay_manager.stats.items()):
+        echo_console(
+            f'{namespace:<24}{delay_manager.pending(namespace):>8}{stats.peak:>8}{stats.calls:>10}'
+            f'{stats.percentile(stats.lateness, 0.5):>10.3f}{stats.percentile(stats.lateness, 0.99):>8.3f}'
+            f'{stats.percentile(stats.cost, 0.5):>10.3f}{stats.percentile(stats.cost, 0.99):>8.3f}'
+        )
+
+
+@TypedServerCommand('udm_benchmark')
+def on_servercommand_benchmark(command_info, name=None):
+    """Run the benchmark `name`, or list all benchmarks."""
+    if name not in benchmarks:
+        echo_console(f'[UDM] Benchmarks: {", ".join(sorted(benchmarks))}')
+        return
+
+    benchmarks[name]()
+
+
+@TypedServerCommand('udm_reload_weapons')
+def on_servercommand_reload_weapons(command_info):
+    """Apply changes of the weapon data file without reloading the plugin."""
+    try:
+        added, removed, changed = weapon_manager.reload()
+    except ValueError as error:
+
+        # Keep the current weapons if the weapon data file is invalid
+        echo_console(f'[UDM] Weapons not reloaded: {error}')
+        return
+
+    # Rebuild the weapon menus and random weapon decks
+    rebuild_menus()
+    random_weapon_decks.rebuild()
+
+    # Drop inventory items of removed weapons and refresh random weapons
+    dropped = PlayerEntity.drop_removed_weapons()
+
+    # Replace the removed weapons alive players are equipped with
+    for player in PlayerEntity.alive():
+        player.replace_removed_weapons()
+
+    # Tell the server
+    echo_console(
+        f'[UDM] Weapons reloaded: {len(added)} added, {len(removed)} removed, {len(changed)} changed, '
+        f'{dropped} inventory item(s) dropped.'
+    )
+
+
+@TypedServerCommand('udm_parked_inventories')
+def on_servercommand_parked_inventories(command_info):
+    """Print how many records of disconnected players are kept, restored and evicted."""
+    parked_records = PlayerEntity.parked_records_store
+
+    echo_console(
+        f'[UDM] Parked inventories: {len(parked_records)}/{parked_records.capacity} kept, '
+        f'{parked_records.restores} restored, {parked_records.evictions} dropped.'
+    )
+
+
+@TypedServerCommand('udm_weapon_collisions')
+def on_servercommand_weapon_collisions(command_info, action=None):
+    """Print the weapons which are given with a team flip for each team, or forget them."""
+    if action == 'reset':
+        classname_collisions.reset()
+
+        # Tell the server
+        echo_console('[UDM] Weapon classname collisions reset.')
+        return
+
+    # Print the weapons for each team
+    for team in (2, 3):
+        names = sorted(classname_collisions.get(team, ()))
+        echo_console(f'[UDM] Team {team}: {", ".join(names) if names else "-"}')
+
+
 # =============================================================================
 # >> LOAD & UNLOAD
 # =============================================================================
@@ -536,7 +699,7 @@ def load():
     EntityInputDispatcher.perform_action(map_functions, 'Disable')
 
     # Remove forbidden entities after 2 seconds
-    delay_manager(f'remove_forbidden_entities', 2, EntityRemover.perform_action, (forbidden_entities,))
+    delay_manager(('remove_forbidden_entities', None), 2, EntityRemover.perform_action, (forbidden_entities,))
 
     # Restart the game after 3 seconds
     mp_restartgame.set_int(3)
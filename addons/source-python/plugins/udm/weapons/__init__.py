@@ -25,6 +25,8 @@ from weapons.manager import weapon_manager as sp_weapon_manager
 # Script Imports
 #   Info
 from udm.info import info
+#   Weapons
+from udm.weapons.cache import WeaponTableCache
 
 
 # =============================================================================
@@ -36,6 +38,9 @@ silencer_entities = (
     'm4a1_silencer' if GAME_NAME == 'csgo' else 'm4a1'
 )
 
+# Store a set of classnames of weapons which can be silenced
+silencer_classnames = frozenset({'weapon_m4a1', 'weapon_hkp2000' if GAME_NAME == 'csgo' else 'weapon_usp'})
+
 
 # =============================================================================
 # >> WEAPON DATA
@@ -43,13 +48,20 @@ silencer_entities = (
 class _WeaponData(object):
     """Class used to store weapon data."""
 
-    def __init__(self, basename, weapon_class, display_name, tag):
+    __slots__ = (
+        '_id', '_basename', '_clip', '_display_name', '_has_silencer', '_name', '_maxammo', '_tag'
+    )
+
+    def __init__(self, weapon_id, basename, display_name, tag, name, clip, maxammo):
         """Object initialization."""
+        # Store the weapon's ID
+        self._id = weapon_id
+
         # Store the weapon's basename
         self._basename = basename
 
         # Store the weapon's clip
-        self._clip = weapon_class.clip
+        self._clip = clip
 
         # Store the weapon's display name
         self._display_name = display_name
@@ -58,14 +70,24 @@ class _WeaponData(object):
         self._has_silencer = basename in silencer_entities
 
         # Store the weapon's name
-        self._name = weapon_class.name
+        self._name = name
 
         # Store the weapon's maxammo value
-        self._maxammo = weapon_class.maxammo
+        self._maxammo = maxammo
 
         # Store the weapon's primary tag
         self._tag = tag
 
+    @property
+    def id(self):
+        """Return the weapon's ID."""
+        return self._id
+
+    @property
+    def fields(self):
+        """Return a tuple of all the weapon's data besides its ID."""
+        return self._basename, self._display_name, self._tag, self._name, self._clip, self._maxammo
+
     @property
     def basename(self):
         """Return the weapon's basename."""
@@ -106,17 +128,53 @@ class _WeaponData(object):
 # >> WEAPON MANAGER
 # =============================================================================
 class WeaponManager(dict):
-    """Class used to manage weapons listed in the weapons data file."""
+    """Class used to manage weapons listed in the weapons data file.
+
+    Each weapon is given a small integer ID (its position in the weapon data file), so inventories and
+    random weapons can store ints and resolve them via `by_id()`. `by_name()` returns the `_WeaponData`
+    object for any name the weapon is known by (or None), and `by_tag()` returns precomputed tuples,
+    so neither allocates on lookups.
 
-    ini = ConfigObj(PLUGIN_DATA_PATH.joinpath(info.name, 'weapons', f'{GAME_NAME}.ini'))
+    The resolved weapon table is cached (see `WeaponTableCache`), so the weapon data file only gets
+    parsed and validated again after it has been changed.
+    """
+
+    # Store the path to the weapon data file
+    ini_file = PLUGIN_DATA_PATH.joinpath(info.name, 'weapons', f'{GAME_NAME}.ini')
 
     def __init__(self):
         """Object initialization."""
         # Call dict's constructor
         super().__init__()
 
-        # Update this dictionary with the weapon data file entries
-        for tag, weapon_names in self.ini.items():
+        # Store the `_WeaponData` objects by their ID
+        self._by_id = list()
+
+        # Store the tags provided by the weapon data file
+        self._tags = list()
+
+        # Store the `_WeaponData` objects of each tag as tag => tuple
+        self._by_tag = dict()
+
+        # Store all names a weapon can be looked up by as name => `_WeaponData`
+        self._aliases = dict()
+
+        # Look up weapon names with a single dictionary lookup
+        self.by_name = self._aliases.get
+
+        # Update this dictionary with the weapon table
+        self.load()
+
+    @classmethod
+    def read_table(cls):
+        """Parse and validate the weapon data file and return a tuple of (tags, entries).
+
+        Each entry is a (tag, basename, display name, weapon name, clip, maxammo) tuple.
+        """
+        ini = ConfigObj(cls.ini_file)
+        entries = list()
+
+        for tag, weapon_names in ini.items():
             for basename, display_name in weapon_names.items():
 
                 # If the configured weapon does not exist in that game,
@@ -127,11 +185,101 @@ class WeaponManager(dict):
                 # Get the weapon class from Source.Python's `weapon_manager`
                 weapon_class = sp_weapon_manager[basename.replace('_silenced', '')]
 
-                # Store the `_WeaponData` object at `basename`
-                self[basename] = _WeaponData(basename, weapon_class, display_name, tag)
+                # Store the entry
+                entries.append(
+                    (tag, basename, display_name, weapon_class.name, weapon_class.clip, weapon_class.maxammo)
+                )
 
-        # Store the tags provided by the weapon data file
-        self._tags = list(self.ini.keys())
+        return list(ini.keys()), entries
+
+    def load(self):
+        """Load the weapon table from the cache, or from the weapon data file if the cache is outdated."""
+        cache = WeaponTableCache(self.ini_file, GAME_NAME)
+        table = cache.load()
+
+        if table is None:
+            table = self.read_table()
+            cache.save(*table)
+
+        self.apply_table(*table)
+
+    def reload(self):
+        """Parse the weapon data file again and apply it in place.
+
+        Return a tuple of (added, removed, changed) basename sets - see `apply_table()`.
+        """
+        table = self.read_table()
+
+        # Refresh the cache
+        WeaponTableCache(self.ini_file, GAME_NAME).save(*table)
+
+        return self.apply_table(*table)
+
+    def apply_table(self, tags, entries):
+        """Replace the weapons stored in this dictionary with those of the weapon table.
+
+        Weapons which are still listed keep their ID, new weapons get new IDs and the IDs of removed weapons
+        resolve to None, so IDs stored elsewhere never point at a different weapon.
+        Return a tuple of (added, removed, changed) basename sets.
+        """
+        previous = dict(self)
+        changed = set()
+
+        # Store the `_WeaponData` objects at their basename and at their ID
+        self.clear()
+
+        for tag, basename, display_name, name, clip, maxammo in entries:
+            weapon_id = previous[basename].id if basename in previous else len(self._by_id)
+            weapon_data = self[basename] = _WeaponData(weapon_id, basename, display_name, tag, name, clip, maxammo)
+
+            if weapon_id == len(self._by_id):
+                self._by_id.append(weapon_data)
+            else:
+                self._by_id[weapon_id] = weapon_data
+
+            # Take note of changed weapons
+            if basename in previous and weapon_data.fields != previous[basename].fields:
+                changed.add(basename)
+
+        # Invalidate the IDs of removed weapons
+        removed = previous.keys() - self.keys()
+
+        for basename in removed:
+            self._by_id[previous[basename].id] = None
+
+        # Store the tags
+        self._tags[:] = tags
+
+        # Build both indexes
+        self._build_indexes()
+
+        # Return the differences
+        return self.keys() - previous.keys(), removed, changed
+
+    def _build_indexes(self):
+        """Build the tag and alias indexes from the weapons stored in this dictionary.
+
+            * the basename with and without the weapon prefix always refers to its own weapon
+            * the Source.Python weapon name and the names without `_silenced` only refer to a weapon,
+              if no other weapon is known by them
+        """
+        self._by_tag.clear()
+        self._aliases.clear()
+
+        for tag in self._tags:
+            self._by_tag[tag] = tuple(weapon_data for weapon_data in self.values() if weapon_data.tag == tag)
+
+        for basename, weapon_data in self.items():
+            self._aliases[basename] = weapon_data
+            self._aliases[f'{self.prefix}{basename}'] = weapon_data
+
+        for basename, weapon_data in self.items():
+            self._aliases.setdefault(weapon_data.name, weapon_data)
+
+            if '_silenced' in basename:
+                unsilenced = basename.replace('_silenced', '')
+                self._aliases.setdefault(unsilenced, weapon_data)
+                self._aliases.setdefault(f'{self.prefix}{unsilenced}', weapon_data)
 
     @staticmethod
     def set_silencer(weapon, silencer_option):
@@ -151,20 +299,13 @@ class WeaponManager(dict):
             if weapon.owner is None:
                 weapon.remove()
 
-    def by_tag(self, tag):
-        """Return all _Weapon instances categorized by `tag`."""
-        for weapon in self.values():
-            if weapon.tag == tag:
-                yield weapon
-
-    def by_name(self, name):
-        """Return the `_WeaponData` object for the weapon no matter the weapon prefix."""
-        basename = name.replace(sp_weapon_manager.prefix, '')
-
-        if basename in self.keys():
-            return self[basename]
+    def by_id(self, weapon_id):
+        """Return the `_WeaponData` object for `weapon_id` (None if the weapon has been removed)."""
+        return self._by_id[weapon_id]
 
-        return None
+    def by_tag(self, tag):
+        """Return a tuple of all `_WeaponData` objects categorized by `tag`."""
+        return self._by_tag.get(tag, ())
 
     @property
     def prefix(self):
@@ -0,0 +1,106 @@
+# ../udm/weapons/cache.py
+
+"""Provides a cached snapshot of the resolved weapon table."""
+
+# =============================================================================
+# >> IMPORTS
+# =============================================================================
+# Python Imports
+#   Contextlib
+import contextlib
+#   Hashlib
+import hashlib
+#   JSON
+import json
+#   OS
+import os
+
+
+# =============================================================================
+# >> CLASSES
+# =============================================================================
+class WeaponTableCache(object):
+    """Class used to read and write the resolved weapon table of a weapon data file.
+
+    The cache file is stored next to the weapon data file and contains
+
+        * the format version, the game name, the weapon data file's mtime and its SHA-1 hash
+        * the tags in file order
+        * one (tag, basename, display name, weapon name, clip, maxammo) entry per weapon
+
+    The weapon data file stays the editable source of truth: the cache is ignored
+    whenever the game name, or the weapon data file's mtime and hash no longer match.
+    """
+
+    # Store the file format version
+    version = 1
+
+    def __init__(self, ini_file, game_name):
+        """Object initialization."""
+        # Store the path to the weapon data file
+        self._ini_file = str(ini_file)
+
+        # Store the game name
+        self._game_name = game_name
+
+        # Store the path to the cache file
+        self._path = os.path.splitext(self._ini_file)[0] + '.cache'
+
+    def load(self):
+        """Return a tuple of (tags, entries) from the cache file, or None if it is missing or outdated."""
+        try:
+            with open(self._path) as f:
+                contents = json.load(f)
+
+            # Validate the cache's key
+            if contents['version'] != self.version or contents['game'] != self._game_name:
+                return None
+
+            mtime = os.path.getmtime(self._ini_file)
+
+            # Compare the hashes, if the weapon data file has been touched since it was cached
+            if contents['mtime'] != mtime:
+                if self._get_digest() != contents['sha1']:
+                    return None
+
+                # Only the mtime has changed: remember the new one
+                contents['mtime'] = mtime
+                self._write(contents)
+
+            return contents['tags'], [tuple(entry) for entry in contents['weapons']]
+
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(self, tags, entries):
+        """Write `tags` and `entries` to the cache file."""
+        with contextlib.suppress(OSError):
+            self._write({
+                'version': self.version,
+                'game': self._game_name,
+                'mtime': os.path.getmtime(self._ini_file),
+                'sha1': self._get_digest(),
+                'tags': list(tags),
+                'weapons': [list(entry) for entry in entries]
+            })
+
+    def _get_digest(self):
+        """Return the SHA-1 hash of the weapon data file."""
+        with open(self._ini_file, 'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()
+
+    def _write(self, contents):
+        """Write `contents` to the cache file."""
+        temporary_path = f'{self._path}.tmp'
+
+        with contextlib.suppress(OSError):
+            with open(temporary_path, 'w') as f:
+                json.dump(contents, f)
+
+            # Replace the cache file in one step
+            os.replace(temporary_path, self._path)
+
+    @property
+    def path(self):
+        """Return the path to the cache file."""
+        return self._path
@@ -0,0 +1,159 @@
+# ../udm/weapons/collector.py
+
+"""Provides a sweep-based collector for dropped weapons."""
+
+# =============================================================================
+# >> IMPORTS
+# =============================================================================
+# Python Imports
+#   Collections
+from collections import deque
+#   Time
+import time
+
+# Source.Python Imports
+#   Core
+from core import AutoUnload
+#   Entities
+from entities.helpers import index_from_inthandle
+#   Listeners
+from listeners import OnLevelEnd
+from listeners import on_tick_listener_manager
+
+# Script Imports
+#   Config
+from udm.config import cvar_max_ground_weapons
+#   Weapons
+from udm.weapons import weapon_manager
+
+
+# =============================================================================
+# >> CONSTANTS
+# =============================================================================
+# Time (in seconds) a dropped weapon stays on the ground
+GROUND_WEAPON_LIFETIME = 1.0
+
+# Time (in seconds) between two sweeps
+SWEEP_INTERVAL = 0.5
+
+
+# =============================================================================
+# >> GROUND WEAPON COLLECTOR
+# =============================================================================
+class _GroundWeaponCollector(deque, AutoUnload):
+    """Class used to remove dropped weapons in sweeps instead of one delay per drop.
+
+        * drops are queued in time order as (drop time, index, inthandle) tuples
+        * only the latest drop of a weapon counts, so a weapon dropped again gets its full lifetime
+        * weapons picked up are discarded, so they no longer count towards `udm_max_ground_weapons`
+        * a tick listener sweeps every `SWEEP_INTERVAL` seconds while weapons are queued, independent of delays
+        * each sweep removes all expired weapons which are still unowned
+        * the oldest weapons are removed right away if more than `udm_max_ground_weapons` are queued
+    """
+
+    def __init__(self):
+        """Object initialization."""
+        # Call deque's constructor
+        super().__init__()
+
+        # Store the latest drop time of each queued weapon as inthandle => drop time
+        self._drop_times = dict()
+
+        # Store the time of the next sweep and whether the tick listener is registered
+        self._next_sweep = 0.0
+        self._sweeping = False
+
+    def add(self, weapon):
+        """Queue a dropped weapon for removal."""
+        drop_time = time.time()
+
+        self._drop_times[weapon.inthandle] = drop_time
+        self.append((drop_time, weapon.index, weapon.inthandle))
+
+        # Keep the amount of ground weapons within budget
+        budget = cvar_max_ground_weapons.get_int()
+
+        while 0 < budget < len(self._drop_times):
+            self._pop()
+
+        # Start sweeping, if not done yet
+        if self and not self._sweeping:
+            self._next_sweep = drop_time + SWEEP_INTERVAL
+            on_tick_listener_manager.register_listener(self._on_tick)
+            self._sweeping = True
+
+    def discard(self, weapon):
+        """Forget a queued weapon which has been picked up."""
+        self._drop_times.pop(weapon.inthandle, None)
+
+    def sweep(self):
+        """Remove all expired weapons."""
+        expired = time.time() - GROUND_WEAPON_LIFETIME
+
+        while self and self[0][0] <= expired:
+            self._pop()
+
+        # Stop sweeping, if there are no weapons left
+        if not self:
+            self._stop_sweeping()
+
+    def clear(self):
+        """Forget all queued weapons."""
+        super().clear()
+        self._drop_times.clear()
+        self._stop_sweeping()
+
+    def _pop(self):
+        """Dequeue the oldest drop and remove its weapon, unless it has been picked up or dropped again since."""
+        drop_time, index, inthandle = self.popleft()
+
+        # Skip drops which have been discarded or superseded by a later one
+        if self._drop_times.get(inthandle) != drop_time:
+            return
+
+        del self._drop_times[inthandle]
+        self._remove(index, inthandle)
+
+    def _on_tick(self):
+        """Sweep, if `SWEEP_INTERVAL` seconds have passed since the last sweep."""
+        now = time.time()
+
+        if now < self._next_sweep:
+            return
+
+        self._next_sweep = now + SWEEP_INTERVAL
+        self.sweep()
+
+    def _stop_sweeping(self):
+        """Unregister the tick listener."""
+        if self._sweeping:
+            on_tick_listener_manager.unregister_listener(self._on_tick)
+            self._sweeping = False
+
+    def _unload_instance(self):
+        """Stop sweeping on unload."""
+        self._stop_sweeping()
+
+    @staticmethod
+    def _remove(index, inthandle):
+        """Remove the weapon, if its index still refers to the dropped weapon and nobody picked it up."""
+        try:
+            if index_from_inthandle(inthandle) != index:
+                return
+        except (ValueError, OverflowError):
+            return
+
+        weapon_manager.remove_weapon(index)
+
+
+# Store a global instance of `_GroundWeaponCollector`
+ground_weapon_collector = _GroundWeaponCollector()
+
+
+# =============================================================================
+# >> LISTENERS
+# =============================================================================
+@OnLevelEnd
+def on_level_end():
+    """Forget all dropped weapons of the previous map."""
+    ground_weapon_collector.clear()
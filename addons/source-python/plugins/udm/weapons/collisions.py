@@ -0,0 +1,120 @@
+# ../udm/weapons/collisions.py
+
+"""Provides a learned table of weapons which share their classname with another weapon."""
+
+# =============================================================================
+# >> IMPORTS
+# =============================================================================
+# Python Imports
+#   Contextlib
+import contextlib
+#   JSON
+import json
+#   OS
+import os
+
+# Source.Python Imports
+#   Core
+from core import AutoUnload
+from core import GAME_NAME
+#   Listeners
+from listeners import OnLevelEnd
+#   Paths
+from paths import PLUGIN_DATA_PATH
+
+# Script Imports
+#   Info
+from udm.info import info
+
+
+# =============================================================================
+# >> CLASSES
+# =============================================================================
+class _ClassnameCollisions(dict, AutoUnload):
+    """Class used to store which weapons need a team flip to be given correctly as team => set of weapon names.
+
+    `give_named_item()` decides which weapon spawns based on the player's loadout, so e.g. `weapon_m4a1`
+    might spawn an M4A1-S for Counter-Terrorists. The table is learned from the weapons actually given,
+    and saved per game on level end and unload.
+    """
+
+    # Store the path to the table file
+    path = PLUGIN_DATA_PATH.joinpath(info.name, 'weapons', f'{GAME_NAME}.collisions.json')
+
+    def __init__(self):
+        """Object initialization."""
+        # Call dict's constructor
+        super().__init__()
+
+        # Store whether the table has changed since it was saved
+        self._changed = False
+
+        # Load the table
+        self.load()
+
+    def needs_team_flip(self, team, name):
+        """Return whether the weapon `name` needs a team flip to be given to a player of `team`."""
+        return name in self.get(team, ())
+
+    def learn(self, team, name, team_flip):
+        """Remember whether the weapon `name` needs a team flip to be given to a player of `team`."""
+        if team_flip == self.needs_team_flip(team, name):
+            return
+
+        if team_flip:
+            self.setdefault(team, set()).add(name)
+        else:
+            self[team].discard(name)
+
+        self._changed = True
+
+    def load(self):
+        """Load the table from file."""
+        self.clear()
+
+        with contextlib.suppress(OSError, ValueError, TypeError, AttributeError):
+            with open(self.path) as f:
+                contents = json.load(f)
+
+            for team, names in contents.items():
+                self[int(team)] = set(names)
+
+        self._changed = False
+
+    def save(self):
+        """Save the table to file, if it has changed."""
+        if not self._changed:
+            return
+
+        temporary_path = f'{self.path}.tmp'
+
+        with contextlib.suppress(OSError):
+            with open(temporary_path, 'w') as f:
+                json.dump({str(team): sorted(names) for team, names in self.items()}, f, indent=4)
+
+            # Replace the file in one step
+            os.replace(temporary_path, self.path)
+
+            self._changed = False
+
+    def reset(self):
+        """Forget all learned weapons."""
+        self.clear()
+        self._changed = True
+
+    def _unload_instance(self):
+        """Save the table on unload."""
+        self.save()
+
+
+# Store a global instance of `_ClassnameCollisions`
+classname_collisions = _ClassnameCollisions()
+
+
+# =============================================================================
+# >> LISTENERS
+# =============================================================================
+@OnLevelEnd
+def on_level_end():
+    """Save the table learned on the previous map."""
+    classname_collisions.save()
@@ -0,0 +1,122 @@
+# ../udm/weapons/deck.py
+
+"""Provides shared, shuffled decks of weapon IDs for random weapons."""
+
+# =============================================================================
+# >> IMPORTS
+# =============================================================================
+# Python Imports
+#   Array
+from array import array
+#   Random
+import random
+
+# Script Imports
+#   Weapons
+from udm.weapons import weapon_manager
+
+
+# =============================================================================
+# >> CONSTANTS
+# =============================================================================
+# Amount of shuffled permutations of each tag's weapon IDs
+RANDOM_WEAPON_PERMUTATIONS = 8
+
+
+# =============================================================================
+# >> CLASSES
+# =============================================================================
+class RandomWeaponDeck(object):
+    """Class used to hand out random weapon IDs from a few shuffled permutations shared by all players.
+
+        * each player only keeps a cursor (a position in the concatenated permutations)
+        * cursors start at the beginning of a random permutation, so a player's first cycle is a complete one
+        * walking one permutation draws each weapon exactly once, then the cursor continues with the next one
+    """
+
+    def __init__(self):
+        """Object initialization."""
+        # Store the shuffled permutations of weapon IDs
+        self._permutations = tuple()
+
+        # Store the amount of weapon IDs per permutation
+        self._size = 0
+
+    def __len__(self):
+        """Return the amount of weapon IDs in the deck."""
+        return self._size
+
+    def rebuild(self, weapon_ids):
+        """Shuffle new permutations of `weapon_ids`."""
+        permutations = list()
+
+        for _ in range(RANDOM_WEAPON_PERMUTATIONS):
+            order = list(weapon_ids)
+            random.shuffle(order)
+            permutations.append(array('H', order))
+
+        self._permutations = tuple(permutations)
+        self._size = len(weapon_ids)
+
+    def new_cursor(self):
+        """Return the start position of a random permutation in the deck."""
+        return random.randrange(RANDOM_WEAPON_PERMUTATIONS) * self._size
+
+    def draw(self, cursor):
+        """Return a tuple of the weapon ID at `cursor` (None if the deck is empty) and the advanced cursor."""
+        if not self._size:
+            return None, cursor
+
+        # Wrap cursors of an earlier deck
+        cursor %= RANDOM_WEAPON_PERMUTATIONS * self._size
+
+        # Return the weapon ID and the position after it
+        weapon_id = self._permutations[cursor // self._size][cursor % self._size]
+        return weapon_id, (cursor + 1) % (RANDOM_WEAPON_PERMUTATIONS * self._size)
+
+
+class _RandomWeaponDecks(dict):
+    """Class used to store a `RandomWeaponDeck` for each weapon tag.
+
+    A player's cursors are stored in an array with one cursor per tag, in the order of `weapon_manager.tags`.
+    """
+
+    def __init__(self):
+        """Object initialization."""
+        # Call dict's constructor
+        super().__init__()
+
+        # Store the position of each tag's cursor
+        self._positions = dict()
+
+    def rebuild(self):
+        """Rebuild the decks from the weapons currently stored in `weapon_manager`."""
+        self.clear()
+        self._positions.clear()
+
+        for position, tag in enumerate(weapon_manager.tags):
+            self[tag] = RandomWeaponDeck()
+            self[tag].rebuild([weapon_data.id for weapon_data in weapon_manager.by_tag(tag)])
+
+            self._positions[tag] = position
+
+    def new_cursors(self):
+        """Return an array of random start positions, one for each tag."""
+        return array('I', [self[tag].new_cursor() for tag in weapon_manager.tags])
+
+    def draw(self, tag, cursors):
+        """Return the next weapon ID for `tag` and advance the tag's cursor in `cursors`."""
+        position = self._positions[tag]
+        weapon_id, cursors[position] = self[tag].draw(cursors[position])
+
+        return weapon_id
+
+
+# =============================================================================
+# >> PUBLIC GLOBAL VARIABLES
+# =============================================================================
+# Store a global instance of `_RandomWeaponDecks`
+random_weapon_decks = _RandomWeaponDecks()
+
+# Build the decks for the weapons loaded
+random_weapon_decks.rebuild()
@@ -26,6 +26,13 @@ def options_for_tag(tag):
         yield PagedOption(weapon_data.display_name, weapon_data.basename)
 
 
+def rebuild_menus():
+    """Rebuild the options of the Secondary and Primary Weapons menus from the current weapons."""
+    for menu, tag in ((secondary_menu, 'secondary'), (primary_menu, 'primary')):
+        menu.clear()
+        menu.extend(options_for_tag(tag))
+
+
 # =============================================================================
 # >> SECONDARY WEAPONS MENU
 # =============================================================================
@@ -36,7 +43,7 @@ secondary_menu = PagedMenu(data=list(options_for_tag('secondary')), title='Secon
 @secondary_menu.register_close_callback
 def on_close_secondary_menu(menu, player_index):
     """Equip random weapons if the player's inventory is empty."""
-    player = PlayerEntity(player_index)
+    player = PlayerEntity.cached(player_index)
 
     if not player.inventory:
         player.equip_random_weapons()
@@ -45,7 +52,7 @@ def on_close_secondary_menu(menu, player_index):
 @secondary_menu.register_select_callback
 def on_select_secondary_weapon(menu, player_index, option):
     """Add the secondary weapon to the player's inventory."""
-    player = PlayerEntity(player_index)
+    player = PlayerEntity.cached(player_index)
     player.choose_weapon(option.value)
 
 
@@ -65,7 +72,7 @@ def on_close_primary_menu(menu, player_index):
 @primary_menu.register_select_callback
 def on_select_primary_weapon(menu, player_index, option):
     """Add the primary weapon to the player's inventory."""
-    player = PlayerEntity(player_index)
+    player = PlayerEntity.cached(player_index)
     player.choose_weapon(option.value)
 
     # Send the secondary menu to the player
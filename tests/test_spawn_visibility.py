@@ -0,0 +1,137 @@
+"""Tests for the spawn location visibility check, using an injected trace function instead of engine traces."""
+
+# =============================================================================
+# >> IMPORTS
+# =============================================================================
+# Python Imports
+#   Importlib
+import importlib.util
+#   Pathlib
+from pathlib import Path
+#   Sys
+import sys
+#   Types
+from types import ModuleType
+from types import SimpleNamespace
+
+# Site-Package Imports
+#   Pytest
+import pytest
+
+
+# =============================================================================
+# >> CONSTANTS
+# =============================================================================
+# Path to the module under test
+VISIBILITY_PATH = Path(__file__).parents[1].joinpath(
+    'addons', 'source-python', 'plugins', 'udm', 'spawn_locations', 'visibility.py'
+)
+
+# Spawn locations along the x axis: 0 and 1 see each other, 2 is behind a wall
+SPAWN_COORDINATES = [(0.0, 0.0, 0.0), (1000.0, 0.0, 0.0), (3000.0, 0.0, 0.0)]
+
+
+# =============================================================================
+# >> FIXTURES
+# =============================================================================
+def walled_trace(start, end):
+    """Return whether `end` can be seen from `start`, with a wall between x = 2000 and x = 2500."""
+    low, high = sorted((start[0], end[0]))
+    return high < 2000.0 or low > 2500.0
+
+
+class FakePlayerSnapshot(object):
+    """Class used to provide the parts of `player_snapshot` the visibility check reads."""
+
+    def __init__(self, players):
+        """Store `players` as (team, x, y, z) tuples."""
+        self.generation = 1
+        self.moves = list()
+        self.teams = [team for team, *_ in players]
+        self._origins = [tuple(origin) for _, *origin in players]
+
+    def __len__(self):
+        """Return the amount of players in the snapshot."""
+        return len(self.teams)
+
+    def origin(self, slot):
+        """Return the (x, y, z) origin of the player at `slot`."""
+        return self._origins[slot]
+
+
+@pytest.fixture
+def visibility(monkeypatch):
+    """Return the visibility module, loaded against fake Source.Python and UDM modules."""
+    fake_modules = {
+        'core': {'AutoUnload': object},
+        'engines': {},
+        'engines.server': {'global_vars': SimpleNamespace(tick_count=0)},
+        'engines.trace': {
+            'ContentMasks': None, 'engine_trace': None, 'GameTrace': None, 'Ray': None,
+            'TraceFilterSimple': lambda **kwargs: None, 'TraceType': SimpleNamespace(WORLD_ONLY=None)
+        },
+        'listeners': {
+            'OnLevelInit': lambda function: function,
+            'on_tick_listener_manager': SimpleNamespace(register_listener=id, unregister_listener=id)
+        },
+        'mathlib': {'Vector': None},
+        'udm': {},
+        'udm.config': {'cvar_spawn_visibility_traces_per_tick': SimpleNamespace(get_int=lambda: 100)},
+        'udm.spawn_locations': {
+            'spawn_location_manager': SimpleNamespace(
+                version=1, coordinates=SPAWN_COORDINATES, json_file='/nonexistent/spawn_locations.json'
+            )
+        },
+        'udm.spawn_locations.snapshot': {'player_snapshot': FakePlayerSnapshot([])},
+    }
+
+    for name, attributes in fake_modules.items():
+        module = ModuleType(name)
+        module.__dict__.update(attributes)
+        monkeypatch.setitem(sys.modules, name, module)
+
+    spec = importlib.util.spec_from_file_location('udm.spawn_locations.visibility', VISIBILITY_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    return module
+
+
+def build(visibility, players):
+    """Return a `_SpawnVisibility` instance with a complete matrix for `SPAWN_COORDINATES` and `players`."""
+    visibility.player_snapshot.__init__(players)
+
+    spawn_visibility = visibility._SpawnVisibility(walled_trace)
+    spawn_visibility.update()
+
+    while not spawn_visibility.matrix.step(100):
+        pass
+
+    return spawn_visibility
+
+
+# =============================================================================
+# >> TESTS
+# =============================================================================
+@pytest.mark.parametrize('spawn_index', range(len(SPAWN_COORDINATES)))
+def test_enemy_near_spawn_exposes_it(visibility, spawn_index):
+    """An enemy standing near (but not on) a spawn location exposes it."""
+    x, y, z = SPAWN_COORDINATES[spawn_index]
+    spawn_visibility = build(visibility, [(3, x + 150.0, y, z)])
+
+    assert spawn_visibility.is_exposed(spawn_index, 2)
+
+
+def test_visible_spawns_are_exposed(visibility):
+    """An enemy exposes the spawn locations visible from their area, but not those behind a wall."""
+    spawn_visibility = build(visibility, [(3, 150.0, 0.0, 0.0)])
+
+    assert spawn_visibility.is_exposed(1, 2)
+    assert not spawn_visibility.is_exposed(2, 2)
+
+
+def test_teammates_do_not_expose(visibility):
+    """Teammates never expose spawn locations."""
+    spawn_visibility = build(visibility, [(2, 150.0, 0.0, 0.0)])
+
+    assert not any(spawn_visibility.is_exposed(index, 2) for index in range(len(SPAWN_COORDINATES)))
@@ -0,0 +1,206 @@
+# ../tools/validate_spawn_locations.py
+
+"""Validates (and optionally deduplicates) UDM spawn location files offline.
+
+Usage:
+    python tools/validate_spawn_locations.py [--fix] [--min-distance UNITS] [--workers N] [PATH ...]
+
+Each PATH may be a spawn locations JSON file or a directory which is searched recursively.
+Defaults to the plugin's data directory. Exits with status 1 if any file has issues.
+"""
+
+# =============================================================================
+# >> IMPORTS
+# =============================================================================
+# Python Imports
+#   Argparse
+import argparse
+#   Concurrent
+from concurrent.futures import ProcessPoolExecutor
+#   JSON
+import json
+#   Math
+import math
+#   OS
+import os
+#   Sys
+import sys
+
+
+# =============================================================================
+# >> CONSTANTS
+# =============================================================================
+# Safe distance between spawn points (in units) - keep in sync with udm.spawn_locations.SAFE_SPAWN_DISTANCE
+SAFE_SPAWN_DISTANCE = 150.0
+
+# Valid ranges for pitch, yaw and roll
+ANGLE_RANGES = ((-90.0, 90.0), (-360.0, 360.0), (-180.0, 180.0))
+
+# Maximum absolute coordinate of a Source engine map
+MAX_COORDINATE = 16384.0
+
+# Default path to the spawn location files
+DEFAULT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'addons', 'source-python', 'data', 'plugins', 'udm', 'spawn_locations'
+)
+
+
+# =============================================================================
+# >> HELPER FUNCTIONS
+# =============================================================================
+def find_files(paths):
+    """Yield every JSON file found in `paths`."""
+    for path in paths:
+        if os.path.isfile(path):
+            yield path
+            continue
+
+        for root, directories, files in os.walk(path):
+            directories.sort()
+
+            for name in sorted(files):
+                if name.endswith('.json'):
+                    yield os.path.join(root, name)
+
+
+def validate_entry(position, data):
+    """Return a list of issues found with a single spawn location entry."""
+    issues = list()
+
+    try:
+        vector = [float(value) for value in data['vector']]
+        angle = [float(value) for value in data['angle']]
+    except (KeyError, TypeError, ValueError):
+        return [f'#{position}: malformed entry']
+
+    if len(vector) != 3 or len(angle) != 3:
+        return [f'#{position}: vector and angle need three values each']
+
+    if not all(math.isfinite(value) for value in vector + angle):
+        return [f'#{position}: NaN or infinite value']
+
+    if any(abs(value) > MAX_COORDINATE for value in vector):
+        issues.append(f'#{position}: coordinate out of range')
+
+    for name, value, (minimum, maximum) in zip(('pitch', 'yaw', 'roll'), angle, ANGLE_RANGES):
+        if not minimum <= value <= maximum:
+            issues.append(f'#{position}: {name} {value:.2f} out of range')
+
+    return issues
+
+
+def find_close_pairs(vectors, min_distance):
+    """Return a list of (i, j, distance) tuples for spawn locations closer than `min_distance`, using spatial hashing."""
+    cells = dict()
+    pairs = list()
+    min_distance_squared = min_distance ** 2
+
+    for j, (x, y, z) in enumerate(vectors):
+        cell_x, cell_y, cell_z = int(x // min_distance), int(y // min_distance), int(z // min_distance)
+
+        # Compare with the spawn locations already hashed into this and all neighboring cells
+        for offset_x in (-1, 0, 1):
+            for offset_y in (-1, 0, 1):
+                for offset_z in (-1, 0, 1):
+                    for i in cells.get((cell_x + offset_x, cell_y + offset_y, cell_z + offset_z), ()):
+                        other_x, other_y, other_z = vectors[i]
+                        distance_squared = (other_x - x) ** 2 + (other_y - y) ** 2 + (other_z - z) ** 2
+
+                        if distance_squared < min_distance_squared:
+                            pairs.append((i, j, math.sqrt(distance_squared)))
+
+        cells.setdefault((cell_x, cell_y, cell_z), list()).append(j)
+
+    return pairs
+
+
+def validate_file(path, min_distance, fix):
+    """Validate the file at `path` and return a tuple of (path, issues, removed entry count)."""
+    try:
+        with open(path) as f:
+            contents = json.load(f)
+    except (OSError, ValueError) as error:
+        return path, [f'unreadable: {error}'], 0
+
+    if not isinstance(contents, list):
+        return path, ['top level is not a list'], 0
+
+    issues = list()
+    valid = list()
+
+    # Validate each entry
+    for position, data in enumerate(contents, 1):
+        entry_issues = validate_entry(position, data)
+        issues.extend(entry_issues)
+
+        if not entry_issues:
+            valid.append((position, data))
+
+    # Find duplicates and spawn locations which are too close to each other
+    vectors = [tuple(float(value) for value in data['vector']) for position, data in valid]
+    dropped = set()
+
+    for i, j, distance in find_close_pairs(vectors, min_distance):
+        kind = 'duplicate of' if distance == 0 else f'{distance:.1f} units from'
+        issues.append(f'#{valid[j][0]}: {kind} #{valid[i][0]}')
+
+        # Keep the first of both, unless it has been dropped already
+        if i not in dropped:
+            dropped.add(j)
+
+    # Write the deduplicated file
+    removed = 0
+
+    if fix and (dropped or len(valid) != len(contents)):
+        kept = [data for index, (position, data) in enumerate(valid) if index not in dropped]
+        removed = len(contents) - len(kept)
+
+        with open(path, 'w') as f:
+            json.dump(kept, f, indent=4)
+
+    return path, issues, removed
+
+
+# =============================================================================
+# >> MAIN
+# =============================================================================
+def main(argv=None):
+    """Validate all spawn location files given on the command line."""
+    parser = argparse.ArgumentParser(description='Validate UDM spawn location files.')
+    parser.add_argument('paths', nargs='*', default=[DEFAULT_PATH], help='files or directories to validate')
+    parser.add_argument('--fix', action='store_true', help='write deduplicated files, dropping invalid entries')
+    parser.add_argument(
+        '--min-distance', type=float, default=SAFE_SPAWN_DISTANCE,
+        help=f'minimum distance between spawn locations (default: {SAFE_SPAWN_DISTANCE})'
+    )
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes')
+    args = parser.parse_args(argv)
+
+    files = list(find_files(args.paths))
+
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        results = list(executor.map(
+            validate_file, files, [args.min_distance] * len(files), [args.fix] * len(files), chunksize=16
+        ))
+
+    # Report the results
+    failed = 0
+
+    for path, issues, removed in results:
+        if not issues:
+            continue
+
+        failed += 1
+        print(f'{path}: {len(issues)} issue(s)' + (f', {removed} entries removed' if removed else ''))
+
+        for issue in issues:
+            print(f'    {issue}')
+
+    print(f'{len(files)} file(s) checked, {failed} with issues.')
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())